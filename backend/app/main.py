@@ -6,7 +6,11 @@ import socketio
 import os
 
 from app.config import settings
-from app.db import engine, Base
+from app.db import engine, async_engine, Base, SessionLocal
+from app.services.cache_bus import cache_bus
+from app.services.rule_cache import rule_cache
+from app.services.tariff_cache import tariff_cache
+from app.services.vehicle_cache import vehicle_cache
 
 # Import all models so Alembic can detect them
 from app.models import vehicle, event, session, decision, tariff, rule, user, alert  # noqa: F401
@@ -27,7 +31,15 @@ async def lifespan(app: FastAPI):
     # Create tables on startup (use Alembic for production migrations)
     Base.metadata.create_all(bind=engine)
     os.makedirs(settings.SNAPSHOT_DIR, exist_ok=True)
+    # Load the vehicle registry, rules and tariffs and follow other workers' changes
+    with SessionLocal() as db:
+        vehicle_cache.warm(db)
+        rule_cache.load(db)
+        tariff_cache.rebuild(db)
+    cache_bus.start()
     yield
+    cache_bus.stop()
+    await async_engine.dispose()
 
 
 app = FastAPI(
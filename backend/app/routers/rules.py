@@ -8,6 +8,7 @@ from app.db import get_db
 from app.auth import require_roles
 from app.models.rule import Rule, RuleHistory
 from app.models.user import User
+from app.services.rule_cache import rule_cache
 
 router = APIRouter()
 
@@ -48,7 +49,9 @@ def update_rule(
     history = RuleHistory(rule_key=key, old_value=old_value, new_value=data.value, changed_by=current_user.username)
     db.add(history)
     db.commit()
-    return {"key": key, "value": rule.value}
+    # Every worker's RuleEngine picks the change up on its next decision
+    version = rule_cache.bump()
+    return {"key": key, "value": rule.value, "version": version}
 
 
 @router.get("/{key}/history")
@@ -9,6 +9,7 @@ from app.auth import require_roles
 from app.models.tariff import Tariff
 from app.models.user import User
 from app.services.rule_engine import RuleEngine
+from app.services.tariff_cache import tariff_cache
 
 router = APIRouter()
 
@@ -41,6 +42,7 @@ def create_tariff(data: TariffIn, db: DBSession = Depends(get_db), _: User = Dep
     db.add(t)
     db.commit()
     db.refresh(t)
+    tariff_cache.invalidate()
     return _to_out(t)
 
 
@@ -53,6 +55,7 @@ def update_tariff(tariff_id: str, data: TariffIn, db: DBSession = Depends(get_db
         setattr(t, k, v)
     db.commit()
     db.refresh(t)
+    tariff_cache.invalidate()
     return _to_out(t)
 
 
@@ -63,6 +66,7 @@ def delete_tariff(tariff_id: str, db: DBSession = Depends(get_db), _: User = Dep
         raise HTTPException(404, "Tariff not found")
     db.delete(t)
     db.commit()
+    tariff_cache.invalidate()
 
 
 @router.get("/simulate")
@@ -10,6 +10,7 @@ from app.auth import get_current_user
 from app.models.vehicle import Vehicle, VehicleCategory, VehicleType
 from app.models.user import User
 from app.services.plate_utils import normalize_plate
+from app.services.vehicle_cache import vehicle_cache
 
 router = APIRouter()
 
@@ -99,6 +100,7 @@ def create_vehicle(data: VehicleIn, db: DBSession = Depends(get_db), _: User = D
     db.add(v)
     db.commit()
     db.refresh(v)
+    vehicle_cache.invalidate(v.plate_normalized)
     return _to_out(v)
 
 
@@ -107,6 +109,7 @@ def update_vehicle(vehicle_id: str, data: VehicleIn, db: DBSession = Depends(get
     v = db.query(Vehicle).filter(Vehicle.id == vehicle_id).first()
     if not v:
         raise HTTPException(404, "Vehicle not found")
+    old_plate = v.plate_normalized
     for field, val in data.model_dump(exclude_unset=True).items():
         if hasattr(v, field):
             setattr(v, field, val)
@@ -114,6 +117,7 @@ def update_vehicle(vehicle_id: str, data: VehicleIn, db: DBSession = Depends(get
         v.plate_normalized = normalize_plate(data.plate)
     db.commit()
     db.refresh(v)
+    vehicle_cache.invalidate(old_plate, v.plate_normalized)
     return _to_out(v)
 
 
@@ -122,8 +126,10 @@ def delete_vehicle(vehicle_id: str, db: DBSession = Depends(get_db), _: User = D
     v = db.query(Vehicle).filter(Vehicle.id == vehicle_id).first()
     if not v:
         raise HTTPException(404, "Vehicle not found")
+    plate = v.plate_normalized
     db.delete(v)
     db.commit()
+    vehicle_cache.invalidate(plate)
 
 
 @router.post("/{vehicle_id}/blacklist")
@@ -133,6 +139,7 @@ def blacklist_vehicle(vehicle_id: str, db: DBSession = Depends(get_db), _: User
         raise HTTPException(404, "Vehicle not found")
     v.category = VehicleCategory.blacklist
     db.commit()
+    vehicle_cache.invalidate(v.plate_normalized)
     return {"message": "Vehicle blacklisted"}
 
 
@@ -143,4 +150,5 @@ def whitelist_vehicle(vehicle_id: str, db: DBSession = Depends(get_db), _: User
         raise HTTPException(404, "Vehicle not found")
     v.category = VehicleCategory.visitor
     db.commit()
+    vehicle_cache.invalidate(v.plate_normalized)
     return {"message": "Vehicle removed from blacklist"}
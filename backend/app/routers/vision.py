@@ -1,21 +1,28 @@
 """Vision events router — called by the camera/vision pipeline."""
 from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, BackgroundTasks
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, BackgroundTasks, File, Form, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, Field, ValidationError, field_validator
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session as DBSession
-from typing import Optional
+from typing import List, Optional, Tuple
 import base64, os, uuid
 
-from app.db import get_db
+from app.db import AsyncSessionLocal, get_async_db, get_db
 from app.config import settings
-from app.models.vehicle import Vehicle
 from app.models.event import Event, EventType
 from app.models.decision import Decision, DecisionOutcome
 from app.models.alert import AlertType
 from app.services.rule_engine import RuleEngine
-from app.services.session_service import open_session, close_session, get_open_session
-from app.services.alert_service import create_alert
+from app.services.session_service import (
+    open_session, close_session, get_open_session,
+    open_session_async, close_session_async, get_open_session_async,
+    new_session, settle_session, get_open_sessions,
+)
+from app.services.alert_service import create_alert, create_alert_async, new_alert
 from app.services.plate_utils import normalize_plate
+from app.services.vehicle_cache import vehicle_cache
 
 router = APIRouter()
 
@@ -29,6 +36,15 @@ class PlateEventIn(BaseModel):
     vehicle_type: str = "car"
     image_base64: Optional[str] = None
     event_type: str = "entry"    # "entry" | "exit"
+    captured_at: Optional[datetime] = None   # when the reading was taken, if not on arrival
+
+    @field_validator("captured_at")
+    @classmethod
+    def _captured_at_utc(cls, v: Optional[datetime]) -> Optional[datetime]:
+        # Session times and tariff windows are tz-aware; a naive timestamp is taken as UTC
+        if v is not None and v.tzinfo is None:
+            v = v.replace(tzinfo=timezone.utc)
+        return v
 
 
 class PlateEventOut(BaseModel):
@@ -39,10 +55,17 @@ class PlateEventOut(BaseModel):
     event_id: str
 
 
-def _save_snapshot(image_base64: str) -> Optional[str]:
-    """Save base64-encoded image to disk, return URL path."""
+class PlateEventBatchIn(BaseModel):
+    events: List[PlateEventIn] = Field(..., min_length=1, max_length=settings.PLATE_EVENT_BATCH_MAX)
+
+
+class PlateEventBatchOut(BaseModel):
+    results: List[PlateEventOut]   # in request order
+
+
+def _save_snapshot(data: bytes) -> Optional[str]:
+    """Save a JPEG snapshot to disk, return URL path."""
     try:
-        data = base64.b64decode(image_base64)
         filename = f"{uuid.uuid4()}.jpg"
         path = os.path.join(settings.SNAPSHOT_DIR, filename)
         os.makedirs(settings.SNAPSHOT_DIR, exist_ok=True)
@@ -53,37 +76,137 @@ def _save_snapshot(image_base64: str) -> Optional[str]:
         return None
 
 
-@router.post("/plate-event", response_model=PlateEventOut)
+def _decode_image(payload: PlateEventIn) -> Optional[bytes]:
+    if not payload.image_base64:
+        return None
+    try:
+        return base64.b64decode(payload.image_base64)
+    except ValueError:
+        return None
+
+
+def _parse_upload(event: str) -> PlateEventIn:
+    try:
+        return PlateEventIn.model_validate_json(event)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+
+
 def plate_event(
     payload: PlateEventIn,
     background_tasks: BackgroundTasks,
     db: DBSession = Depends(get_db),
 ):
-    plate_normalized = normalize_plate(payload.plate)
+    return _handle_plate_event(payload, _decode_image(payload), background_tasks, db)
+
+
+def plate_event_upload(
+    background_tasks: BackgroundTasks,
+    event: str = Form(..., description="PlateEventIn as JSON"),
+    snapshot: Optional[UploadFile] = File(None),
+    db: DBSession = Depends(get_db),
+):
+    """Same as /plate-event, with the snapshot sent as a binary multipart file instead of base64."""
+    payload = _parse_upload(event)
+    image = snapshot.file.read() if snapshot is not None else None
+    return _handle_plate_event(payload, image, background_tasks, db)
+
+
+async def plate_event_async(
+    payload: PlateEventIn,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await _handle_plate_event_async(payload, _decode_image(payload), background_tasks, db)
+
+
+async def plate_event_upload_async(
+    background_tasks: BackgroundTasks,
+    event: str = Form(..., description="PlateEventIn as JSON"),
+    snapshot: Optional[UploadFile] = File(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Same as /plate-event, with the snapshot sent as a binary multipart file instead of base64."""
+    payload = _parse_upload(event)
+    image = await snapshot.read() if snapshot is not None else None
+    return await _handle_plate_event_async(payload, image, background_tasks, db)
+
+
+def plate_event_batch(batch: PlateEventBatchIn, db: DBSession = Depends(get_db)):
+    """Ordered plate events (e.g. a gate's backlog after an outage) in one transaction.
+
+    Events are applied in request order, so an entry and a later exit of the
+    same plate in one batch open and close the same session.
+    """
+    now = datetime.now(timezone.utc)
+    image_urls = _save_snapshots(batch.events)
+    results = _ingest_batch(db, batch.events, image_urls, now)
+    db.commit()
+    return PlateEventBatchOut(results=results)
+
+
+async def plate_event_batch_async(batch: PlateEventBatchIn, db: AsyncSession = Depends(get_async_db)):
+    """Ordered plate events (e.g. a gate's backlog after an outage) in one transaction.
+
+    Events are applied in request order, so an entry and a later exit of the
+    same plate in one batch open and close the same session.
+    """
     now = datetime.now(timezone.utc)
+    image_urls = await run_in_threadpool(_save_snapshots, batch.events)
+    results = await db.run_sync(_ingest_batch, batch.events, image_urls, now)
+    await db.commit()
+    return PlateEventBatchOut(results=results)
 
-    # Low-confidence flag
-    if payload.confidence < settings.get("access.low_confidence_threshold", 0.70) if hasattr(settings, "get") else payload.confidence < 0.70:
-        background_tasks.add_task(
-            create_alert, db, AlertType.LOW_CONFIDENCE,
+
+# The async handlers serve the gates unless ASYNC_PLATE_EVENTS is off; both
+# paths make the same decisions and write the same rows.
+if settings.ASYNC_PLATE_EVENTS:
+    router.add_api_route("/plate-event", plate_event_async, methods=["POST"], response_model=PlateEventOut)
+    router.add_api_route("/plate-event/upload", plate_event_upload_async, methods=["POST"], response_model=PlateEventOut)
+    router.add_api_route("/plate-event/batch", plate_event_batch_async, methods=["POST"], response_model=PlateEventBatchOut)
+else:
+    router.add_api_route("/plate-event", plate_event, methods=["POST"], response_model=PlateEventOut)
+    router.add_api_route("/plate-event/upload", plate_event_upload, methods=["POST"], response_model=PlateEventOut)
+    router.add_api_route("/plate-event/batch", plate_event_batch, methods=["POST"], response_model=PlateEventBatchOut)
+
+
+def _alerts(payload: PlateEventIn, plate_normalized: str, result: dict) -> List[Tuple[AlertType, str, dict]]:
+    """Alerts raised by one event: (type, message, extra fields)."""
+    alerts = []
+    low_confidence = payload.confidence < settings.get("access.low_confidence_threshold", 0.70) if hasattr(settings, "get") else payload.confidence < 0.70
+    if low_confidence:
+        alerts.append((
+            AlertType.LOW_CONFIDENCE,
             f"Low OCR confidence {payload.confidence:.0%} on plate {payload.plate}",
-            plate=payload.plate, gate_id=payload.gate_id,
-        )
+            {"plate": payload.plate, "gate_id": payload.gate_id},
+        ))
+    if result["reason_code"] == "BLACKLIST":
+        alerts.append((
+            AlertType.BLACKLIST,
+            f"Blacklisted vehicle {plate_normalized} detected at gate {payload.gate_id}",
+            {"plate": plate_normalized, "gate_id": payload.gate_id},
+        ))
+    return alerts
 
-    # Look up vehicle
-    vehicle = db.query(Vehicle).filter(Vehicle.plate_normalized == plate_normalized).first()
 
-    # Run rule engine
+def _decide(db: DBSession, plate_normalized: str):
+    """Vehicle lookup and access decision — served from the in-memory caches."""
+    vehicle = vehicle_cache.get(db, plate_normalized)
     rule_engine = RuleEngine(db)
-    result = rule_engine.check_access(plate_normalized, vehicle)
+    return vehicle, rule_engine, rule_engine.check_access(plate_normalized, vehicle)
 
-    # Save snapshot
-    image_url = None
-    if payload.image_base64:
-        image_url = _save_snapshot(payload.image_base64)
 
-    # Create event record
+def _records(
+    payload: PlateEventIn,
+    plate_normalized: str,
+    vehicle,
+    result: dict,
+    image_url: Optional[str],
+    now: datetime,
+) -> Tuple[Event, Decision]:
+    # Event id assigned up front so both rows can be built together
     event = Event(
+        id=uuid.uuid4(),
         plate=plate_normalized,
         vehicle_id=vehicle.id if vehicle else None,
         gate_id=payload.gate_id,
@@ -94,12 +217,8 @@ def plate_event(
         decision=result["decision"],
         rule_applied=result.get("rule_ref"),
         image_url=image_url,
-        timestamp=now,
+        timestamp=payload.captured_at or now,
     )
-    db.add(event)
-    db.flush()
-
-    # Create decision record
     decision = Decision(
         event_id=event.id,
         plate=plate_normalized,
@@ -111,6 +230,31 @@ def plate_event(
         gate_action=result["gate_action"],
         timestamp=now,
     )
+    return event, decision
+
+
+def _handle_plate_event(
+    payload: PlateEventIn,
+    image: Optional[bytes],
+    background_tasks: BackgroundTasks,
+    db: DBSession,
+) -> PlateEventOut:
+    plate_normalized = normalize_plate(payload.plate)
+    now = datetime.now(timezone.utc)
+    when = payload.captured_at or now
+
+    # Look up vehicle (in-memory registry, no DB round trip) and run rule engine
+    vehicle, rule_engine, result = _decide(db, plate_normalized)
+
+    # Save snapshot
+    image_url = None
+    if image:
+        image_url = _save_snapshot(image)
+
+    # Create event and decision records
+    event, decision = _records(payload, plate_normalized, vehicle, result, image_url, now)
+    db.add(event)
+    db.flush()   # no relationships between the models: insert the event before rows referencing it
     db.add(decision)
 
     # Session management
@@ -120,23 +264,19 @@ def plate_event(
             auto_session = rule_engine.get("access.visitor_auto_session", True)
             if auto_session:
                 parking_session = open_session(
-                    db, plate_normalized, now, payload.gate_id,
-                    vehicle=vehicle, entry_event_id=str(event.id)
+                    db, plate_normalized, when, payload.gate_id,
+                    vehicle=vehicle, entry_event_id=event.id
                 )
                 session_id = str(parking_session.id)
         elif payload.event_type == "exit":
             open_s = get_open_session(db, plate_normalized)
             if open_s:
-                open_s = close_session(db, open_s, now, payload.gate_id, exit_event_id=str(event.id))
+                open_s = close_session(db, open_s, when, payload.gate_id, exit_event_id=event.id)
                 session_id = str(open_s.id)
 
-    # Blacklist alert
-    if result["reason_code"] == "BLACKLIST":
-        background_tasks.add_task(
-            create_alert, db, AlertType.BLACKLIST,
-            f"Blacklisted vehicle {plate_normalized} detected at gate {payload.gate_id}",
-            plate=plate_normalized, gate_id=payload.gate_id,
-        )
+    # Low-confidence and blacklist alerts
+    for alert_type, message, fields in _alerts(payload, plate_normalized, result):
+        background_tasks.add_task(create_alert, db, alert_type, message, **fields)
 
     db.commit()
 
@@ -147,3 +287,137 @@ def plate_event(
         session_id=session_id,
         event_id=str(event.id),
     )
+
+
+async def _handle_plate_event_async(
+    payload: PlateEventIn,
+    image: Optional[bytes],
+    background_tasks: BackgroundTasks,
+    db: AsyncSession,
+) -> PlateEventOut:
+    """The plate-event flow on the async engine; same decisions and rows as the sync one."""
+    plate_normalized = normalize_plate(payload.plate)
+    now = datetime.now(timezone.utc)
+    when = payload.captured_at or now
+
+    # Caches are synchronous; a (rare) reload runs through the async connection
+    vehicle, rule_engine, result = await db.run_sync(_decide, plate_normalized)
+
+    image_url = None
+    if image:
+        image_url = await run_in_threadpool(_save_snapshot, image)
+
+    event, decision = _records(payload, plate_normalized, vehicle, result, image_url, now)
+    db.add(event)
+    await db.flush()
+    db.add(decision)
+
+    session_id = None
+    if result["decision"] == "allow":
+        if payload.event_type == "entry":
+            auto_session = rule_engine.get("access.visitor_auto_session", True)
+            if auto_session:
+                parking_session = await open_session_async(
+                    db, plate_normalized, when, payload.gate_id,
+                    vehicle=vehicle, entry_event_id=event.id
+                )
+                session_id = str(parking_session.id)
+        elif payload.event_type == "exit":
+            open_s = await get_open_session_async(db, plate_normalized)
+            if open_s:
+                open_s = await close_session_async(db, open_s, when, payload.gate_id, exit_event_id=event.id)
+                session_id = str(open_s.id)
+
+    for alert_type, message, fields in _alerts(payload, plate_normalized, result):
+        background_tasks.add_task(_alert_async, alert_type, message, **fields)
+
+    await db.commit()
+
+    return PlateEventOut(
+        decision=result["decision"],
+        reason=result["reason_code"],
+        gate_action=result["gate_action"],
+        session_id=session_id,
+        event_id=str(event.id),
+    )
+
+
+async def _alert_async(alert_type: AlertType, message: str, **kwargs):
+    # Runs after the response, when the request's session is already closed
+    async with AsyncSessionLocal() as db:
+        await create_alert_async(db, alert_type, message, **kwargs)
+
+
+def _save_snapshots(payloads: List[PlateEventIn]) -> List[Optional[str]]:
+    urls = []
+    for payload in payloads:
+        image = _decode_image(payload)
+        urls.append(_save_snapshot(image) if image else None)
+    return urls
+
+
+def _ingest_batch(
+    db: DBSession,
+    payloads: List[PlateEventIn],
+    image_urls: List[Optional[str]],
+    now: datetime,
+) -> List[PlateEventOut]:
+    """Decide and record a batch of events in order; the caller commits.
+
+    Open sessions for the batch's exits are read in one query and sessions
+    opened earlier in the batch are matched in memory, so the only other
+    statements are the batched inserts (and updates of closed sessions).
+    """
+    rule_engine = RuleEngine(db)
+    auto_session = rule_engine.get("access.visitor_auto_session", True)
+
+    decided = []
+    for payload in payloads:
+        plate_normalized = normalize_plate(payload.plate)
+        vehicle = vehicle_cache.get(db, plate_normalized)
+        decided.append((payload, plate_normalized, vehicle, rule_engine.check_access(plate_normalized, vehicle)))
+
+    open_sessions = get_open_sessions(db, (
+        plate for payload, plate, _, result in decided
+        if payload.event_type == "exit" and result["decision"] == "allow"
+    ))
+
+    events, rows, results = [], [], []
+    for (payload, plate_normalized, vehicle, result), image_url in zip(decided, image_urls):
+        when = payload.captured_at or now
+        event, decision = _records(payload, plate_normalized, vehicle, result, image_url, now)
+        events.append(event)
+        rows.append(decision)
+
+        session_id = None
+        if result["decision"] == "allow":
+            if payload.event_type == "entry" and auto_session:
+                parking_session = new_session(
+                    plate_normalized, when, payload.gate_id, vehicle=vehicle, entry_event_id=event.id
+                )
+                rows.append(parking_session)
+                open_sessions[plate_normalized] = parking_session
+                session_id = str(parking_session.id)
+            elif payload.event_type == "exit":
+                open_s = open_sessions.pop(plate_normalized, None)
+                if open_s is not None:
+                    settle_session(db, open_s, when, payload.gate_id, exit_event_id=event.id)
+                    session_id = str(open_s.id)
+
+        for alert_type, message, fields in _alerts(payload, plate_normalized, result):
+            rows.append(new_alert(alert_type, message, **fields))
+
+        results.append(PlateEventOut(
+            decision=result["decision"],
+            reason=result["reason_code"],
+            gate_action=result["gate_action"],
+            session_id=session_id,
+            event_id=str(event.id),
+        ))
+
+    # Events first — the other rows reference them; each flush batches its inserts per table
+    db.add_all(events)
+    db.flush()
+    db.add_all(rows)
+    db.flush()
+    return results
@@ -1,5 +1,6 @@
 """Alert service — create and manage system alerts."""
 from datetime import datetime, timezone
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session as DBSession
 
 from app.models.alert import Alert, AlertType, AlertSeverity
@@ -24,20 +25,45 @@ def create_alert(
     gate_id: str = None,
     severity: AlertSeverity = None,
 ) -> Alert:
+    alert = new_alert(alert_type, message, plate, gate_id, severity)
+    db.add(alert)
+    db.commit()
+    db.refresh(alert)
+    return alert
+
+
+async def create_alert_async(
+    db: AsyncSession,
+    alert_type: AlertType,
+    message: str,
+    plate: str = None,
+    gate_id: str = None,
+    severity: AlertSeverity = None,
+) -> Alert:
+    alert = new_alert(alert_type, message, plate, gate_id, severity)
+    db.add(alert)
+    await db.commit()
+    await db.refresh(alert)
+    return alert
+
+
+def new_alert(
+    alert_type: AlertType,
+    message: str,
+    plate: str = None,
+    gate_id: str = None,
+    severity: AlertSeverity = None,
+) -> Alert:
+    """An alert row, not yet added to a DB session (the caller commits)."""
     if severity is None:
         severity = ALERT_SEVERITY_MAP.get(alert_type, AlertSeverity.medium)
-
-    alert = Alert(
+    return Alert(
         alert_type=alert_type,
         severity=severity,
         plate=plate,
         gate_id=gate_id,
         message=message,
     )
-    db.add(alert)
-    db.commit()
-    db.refresh(alert)
-    return alert
 
 
 def resolve_alert(db: DBSession, alert_id: str, resolved_by: str) -> Alert:
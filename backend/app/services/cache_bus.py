@@ -0,0 +1,84 @@
+"""Cache bus — Redis pub/sub fan-out of cache invalidations between worker processes.
+
+Each in-process cache subscribes a handler to its channel. Messages
+published by this process are not delivered back to it. When the
+connection drops, messages may have been missed, so every subscriber's
+``on_gap`` callback is invoked and should force a full reload.
+"""
+import json
+import logging
+import threading
+import uuid
+from typing import Callable, Dict, Optional, Tuple
+
+import redis
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[dict], None]
+
+
+class CacheBus:
+    def __init__(self, url: str = settings.REDIS_URL):
+        self.url = url
+        self._origin = uuid.uuid4().hex
+        self._handlers: Dict[str, Tuple[Handler, Callable[[], None]]] = {}
+        self._redis: Optional[redis.Redis] = None
+        self._listener: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    def subscribe(self, channel: str, handler: Handler, on_gap: Callable[[], None]):
+        """Register ``handler(data)`` for messages from other workers on ``channel``."""
+        self._handlers[channel] = (handler, on_gap)
+
+    def publish(self, channel: str, data: dict) -> bool:
+        """Broadcast ``data`` to the other workers; False if Redis is unreachable."""
+        try:
+            self.client().publish(channel, json.dumps({"origin": self._origin, **data}))
+            return True
+        except redis.RedisError as e:
+            logger.warning("Cache message on %s not published: %s", channel, e)
+            return False
+
+    def start(self):
+        """Follow subscribed channels on a daemon thread."""
+        if self._listener is not None or not self._handlers:
+            return
+        self._stopping.clear()
+        self._listener = threading.Thread(target=self._listen, name="cache-bus", daemon=True)
+        self._listener.start()
+
+    def stop(self):
+        self._stopping.set()
+        self._listener = None
+
+    def _listen(self):
+        while not self._stopping.is_set():
+            try:
+                pubsub = self.client().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(*self._handlers)
+                while not self._stopping.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is None:
+                        continue
+                    data = json.loads(message["data"])
+                    channel = message["channel"]
+                    channel = channel.decode() if isinstance(channel, bytes) else channel
+                    if data.get("origin") != self._origin and channel in self._handlers:
+                        self._handlers[channel][0](data)
+                pubsub.close()
+            except (redis.RedisError, ValueError) as e:
+                logger.warning("Cache bus listener error (%s) — caches reload on next use", e)
+                for _, on_gap in self._handlers.values():
+                    on_gap()
+                self._stopping.wait(5.0)
+
+    def client(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = redis.Redis.from_url(self.url, socket_connect_timeout=0.5, socket_timeout=2.0)
+        return self._redis
+
+
+cache_bus = CacheBus()
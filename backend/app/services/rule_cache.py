@@ -0,0 +1,125 @@
+"""Rule cache — a versioned, process-wide snapshot of the rules table.
+
+``RuleEngine`` reads rules from the current snapshot instead of querying
+them per construction. ``bump`` (called by the rules router after a write)
+raises the version in Redis and broadcasts it on the cache bus; every
+worker then reloads on its next use. Without Redis the snapshot is still
+reloaded every RULE_CACHE_TTL seconds, which bounds how long a change
+takes to reach the other workers. After a Redis error the shared version is
+not asked for again until a growing backoff has passed, so an outage does
+not add a connect timeout to every reload on the request path.
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
+
+import redis
+from sqlalchemy.orm import Session as DBSession
+
+from app.config import settings
+from app.models.rule import Rule
+from app.services.cache_bus import CacheBus, cache_bus
+
+logger = logging.getLogger(__name__)
+
+_VERSION_KEY = "tunispark:rules:version"
+_REDIS_RETRY_MIN = 5.0     # seconds before asking Redis again after an error
+_REDIS_RETRY_MAX = 300.0
+
+
+@dataclass(frozen=True)
+class RuleSnapshot:
+    version: int
+    values: Mapping[str, Any] = field(default_factory=dict)
+
+
+class RuleCache:
+    def __init__(
+        self,
+        ttl: int = settings.RULE_CACHE_TTL,
+        channel: str = settings.RULE_CACHE_CHANNEL,
+        bus: CacheBus = cache_bus,
+    ):
+        self.ttl = ttl
+        self.channel = channel
+        self._bus = bus
+        self._snapshot: Optional[RuleSnapshot] = None
+        self._loaded_at = float("-inf")
+        # Highest version announced by any worker; reload when ours is older
+        self._latest = 0
+        self._lock = threading.Lock()
+        # Redis backoff: no version reads/increments before this monotonic time
+        self._redis_retry_at = float("-inf")
+        self._redis_backoff = _REDIS_RETRY_MIN
+        bus.subscribe(channel, self._on_version, self.expire)
+
+    def snapshot(self, db: DBSession) -> RuleSnapshot:
+        """Return the current rules, reloading them only when a newer version exists or the TTL ran out."""
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.version < self._latest or time.monotonic() - self._loaded_at > self.ttl:
+            snapshot = self.load(db)
+        return snapshot
+
+    def load(self, db: DBSession) -> RuleSnapshot:
+        version = max(self._latest, self._shared_version())
+        values = MappingProxyType({r.key: r.value for r in db.query(Rule).all()})
+        snapshot = RuleSnapshot(version, values)
+        with self._lock:
+            if self._snapshot is None or version >= self._snapshot.version:
+                self._snapshot = snapshot
+                self._loaded_at = time.monotonic()
+        return snapshot
+
+    def bump(self) -> int:
+        """Announce a rule change: raise the version here and in every other worker."""
+        version = None
+        if self._redis_available():
+            try:
+                version = int(self._bus.client().incr(_VERSION_KEY))
+                self._redis_ok()
+            except redis.RedisError as e:
+                self._redis_failed(e)
+        if version is None:
+            logger.warning("Rule version not shared; other workers reload within %ds", self.ttl)
+            version = self._latest + 1
+        with self._lock:
+            self._latest = max(self._latest, version)
+        self._bus.publish(self.channel, {"version": version})
+        return version
+
+    def expire(self):
+        """Force a reload on the next use."""
+        self._loaded_at = float("-inf")
+
+    def _on_version(self, data: dict):
+        with self._lock:
+            self._latest = max(self._latest, int(data.get("version", 0)))
+
+    def _shared_version(self) -> int:
+        if not self._redis_available():
+            return 0
+        try:
+            version = int(self._bus.client().get(_VERSION_KEY) or 0)
+        except redis.RedisError as e:
+            self._redis_failed(e)
+            return 0
+        self._redis_ok()
+        return version
+
+    # ── Redis backoff ──────────────────────────────────────────────────────
+    def _redis_available(self) -> bool:
+        return time.monotonic() >= self._redis_retry_at
+
+    def _redis_ok(self):
+        self._redis_backoff = _REDIS_RETRY_MIN
+
+    def _redis_failed(self, error: Exception):
+        logger.warning("Rule version unavailable (%s); not asking Redis again for %.0fs", error, self._redis_backoff)
+        self._redis_retry_at = time.monotonic() + self._redis_backoff
+        self._redis_backoff = min(self._redis_backoff * 2, _REDIS_RETRY_MAX)
+
+
+rule_cache = RuleCache()
@@ -1,12 +1,13 @@
-"""Rule Engine — reads rules from DB, makes access decisions and calculates billing."""
+"""Rule Engine — reads rules from the shared rule snapshot, makes access decisions and calculates billing."""
 from datetime import datetime, date, timezone
 from typing import Optional
 
 from sqlalchemy.orm import Session as DBSession
 
-from app.models.rule import Rule
 from app.models.vehicle import Vehicle, VehicleCategory
 from app.models.tariff import Tariff
+from app.services.rule_cache import RuleSnapshot, rule_cache
+from app.services.tariff_cache import CompiledTariff, tariff_cache
 
 # Default rule values (used if DB has no entry)
 RULE_DEFAULTS = {
@@ -24,22 +25,22 @@ RULE_DEFAULTS = {
 
 
 class RuleEngine:
-    def __init__(self, db: DBSession):
+    def __init__(self, db: DBSession, snapshot: Optional[RuleSnapshot] = None):
         self.db = db
-        self._cache: dict = {}
-        self._load_rules()
-
-    def _load_rules(self):
-        rules = self.db.query(Rule).all()
-        self._cache = {r.key: r.value for r in rules}
+        # Rules come from the process-wide snapshot — no query unless it is outdated
+        self.snapshot = snapshot or rule_cache.snapshot(db)
+        self._cache = self.snapshot.values
 
     def get(self, key: str, default=None):
         return self._cache.get(key, RULE_DEFAULTS.get(key, default))
 
     # ── Access Decision ────────────────────────────────────────────────────
     def check_access(self, plate: str, vehicle: Optional[Vehicle] = None) -> dict:
-        """Return { decision, reason_code, rule_ref, gate_action, facts }."""
-        facts = {"plate": plate}
+        """Return { decision, reason_code, rule_ref, gate_action, facts }.
+
+        ``vehicle`` may also be a ``CachedVehicle`` from the vehicle registry cache.
+        """
+        facts = {"plate": plate, "rules_version": self.snapshot.version}
 
         if vehicle is None:
             action = self.get("access.unknown_plate_behavior", "allow")
@@ -76,18 +77,17 @@ class RuleEngine:
         vehicle_type: str,
         entry_time: datetime,
         exit_time: datetime,
-        tariff: Optional[Tariff] = None,
+        tariff: Optional[Tariff | CompiledTariff] = None,
     ) -> dict:
-        """Calculate billing for a session."""
-        if tariff is None:
-            tariff = (
-                self.db.query(Tariff)
-                .filter(Tariff.active == True, Tariff.vehicle_types.contains([vehicle_type]))
-                .first()
-            )
+        """Calculate billing for a session.
+
+        Without an explicit ``tariff`` the compiled tariff index picks the
+        first active tariff for the vehicle type valid at entry — no query.
+        """
         if tariff is None:
-            # Fallback to any active tariff
-            tariff = self.db.query(Tariff).filter(Tariff.active == True).first()
+            tariff = tariff_cache.index(self.db).lookup(vehicle_type, entry_time)
+        elif not isinstance(tariff, CompiledTariff):
+            tariff = CompiledTariff.from_row(tariff)
         if tariff is None:
             return {"amount": 0.0, "duration_minutes": 0, "breakdown": "No active tariff found"}
 
@@ -103,7 +103,7 @@ class RuleEngine:
         price = min(price, tariff.daily_max_tnd)
 
         # Night multiplier
-        if self._spans_night(entry_time, exit_time, tariff.night_start, tariff.night_end):
+        if tariff.is_night(entry_time):
             price *= tariff.night_multiplier
 
         # Weekend multiplier  
@@ -116,12 +116,3 @@ class RuleEngine:
             "tariff_name": tariff.name,
             "tariff_id": str(tariff.id),
         }
-
-    def _spans_night(self, entry: datetime, exit: datetime, night_start: str, night_end: str) -> bool:
-        start_h, start_m = map(int, night_start.split(":"))
-        end_h, end_m = map(int, night_end.split(":"))
-        entry_h = entry.hour + entry.minute / 60
-        # Simple check: entry is within night window
-        if start_h > end_h:  # crosses midnight
-            return entry_h >= start_h or entry_h < end_h
-        return start_h <= entry_h < end_h
@@ -1,12 +1,16 @@
 """Session service — create, manage, and close parking sessions."""
+import uuid
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Dict, Iterable, Optional
 
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session as DBSession
 
 from app.models.session import Session as ParkingSession, PaymentStatus
 from app.models.vehicle import Vehicle
 from app.services.rule_engine import RuleEngine
+from app.services.vehicle_cache import CachedVehicle, vehicle_cache
 
 
 def open_session(
@@ -14,11 +18,47 @@ def open_session(
     plate: str,
     entry_time: datetime,
     gate_entry: str,
-    vehicle: Optional[Vehicle] = None,
-    entry_event_id: Optional[str] = None,
+    vehicle: Optional[Vehicle | CachedVehicle] = None,
+    entry_event_id: Optional[uuid.UUID] = None,
 ) -> ParkingSession:
     """Create an open session for a vehicle entering."""
-    session = ParkingSession(
+    session = new_session(plate, entry_time, gate_entry, vehicle, entry_event_id)
+    db.add(session)
+    db.commit()
+    db.refresh(session)
+    return session
+
+
+def close_session(
+    db: DBSession,
+    session: ParkingSession,
+    exit_time: Optional[datetime] = None,
+    gate_exit: Optional[str] = None,
+    exit_event_id: Optional[uuid.UUID] = None,
+) -> ParkingSession:
+    """Close a session, calculate duration and billing."""
+    settle_session(db, session, exit_time, gate_exit, exit_event_id)
+    db.commit()
+    db.refresh(session)
+    return session
+
+
+def get_open_session(db: DBSession, plate: str) -> Optional[ParkingSession]:
+    """Find the most recent open session for a plate."""
+    return db.execute(_open_session_query(plate)).scalars().first()
+
+
+# ── Building blocks (no commit — the caller owns the transaction) ──────────
+def new_session(
+    plate: str,
+    entry_time: datetime,
+    gate_entry: str,
+    vehicle: Optional[Vehicle | CachedVehicle] = None,
+    entry_event_id: Optional[uuid.UUID] = None,
+) -> ParkingSession:
+    """An open session, not yet added to a DB session; its id is assigned up front."""
+    return ParkingSession(
+        id=uuid.uuid4(),
         plate=plate,
         vehicle_id=vehicle.id if vehicle else None,
         entry_time=entry_time,
@@ -26,26 +66,22 @@ def open_session(
         entry_event_id=entry_event_id,
         payment_status=PaymentStatus.pending,
     )
-    db.add(session)
-    db.commit()
-    db.refresh(session)
-    return session
 
 
-def close_session(
+def settle_session(
     db: DBSession,
     session: ParkingSession,
     exit_time: Optional[datetime] = None,
     gate_exit: Optional[str] = None,
-    exit_event_id: Optional[str] = None,
+    exit_event_id: Optional[uuid.UUID] = None,
 ) -> ParkingSession:
-    """Close a session, calculate duration and billing."""
+    """Record the exit and bill it — served from the vehicle, rule and tariff caches."""
     exit_time = exit_time or datetime.now(timezone.utc)
     rule_engine = RuleEngine(db)
 
     vehicle_type = "car"
     if session.vehicle_id:
-        vehicle = db.query(Vehicle).filter(Vehicle.id == session.vehicle_id).first()
+        vehicle = vehicle_cache.get_by_id(db, session.vehicle_id)
         if vehicle:
             vehicle_type = vehicle.vehicle_type.value
 
@@ -61,17 +97,60 @@ def close_session(
     session.duration_minutes = billing["duration_minutes"]
     session.amount_due = billing["amount"]
     session.tariff_snapshot = billing
-
-    db.commit()
-    db.refresh(session)
     return session
 
 
-def get_open_session(db: DBSession, plate: str) -> Optional[ParkingSession]:
-    """Find the most recent open session for a plate."""
+def get_open_sessions(db: DBSession, plates: Iterable[str]) -> Dict[str, ParkingSession]:
+    """Most recent open session per plate, in one query."""
+    plates = set(plates)
+    if not plates:
+        return {}
+    rows = db.execute(
+        select(ParkingSession)
+        .where(ParkingSession.plate.in_(plates), ParkingSession.exit_time == None)  # noqa: E711
+        .order_by(ParkingSession.entry_time)
+    ).scalars()
+    return {s.plate: s for s in rows}   # later entries overwrite earlier ones
+
+
+def _open_session_query(plate: str):
     return (
-        db.query(ParkingSession)
-        .filter(ParkingSession.plate == plate, ParkingSession.exit_time == None)
+        select(ParkingSession)
+        .where(ParkingSession.plate == plate, ParkingSession.exit_time == None)  # noqa: E711
         .order_by(ParkingSession.entry_time.desc())
-        .first()
+        .limit(1)
     )
+
+
+# ── Async variants (plate-event hot path on the async engine) ──────────────
+async def open_session_async(
+    db: AsyncSession,
+    plate: str,
+    entry_time: datetime,
+    gate_entry: str,
+    vehicle: Optional[Vehicle | CachedVehicle] = None,
+    entry_event_id: Optional[uuid.UUID] = None,
+) -> ParkingSession:
+    session = new_session(plate, entry_time, gate_entry, vehicle, entry_event_id)
+    db.add(session)
+    await db.commit()
+    await db.refresh(session)
+    return session
+
+
+async def close_session_async(
+    db: AsyncSession,
+    session: ParkingSession,
+    exit_time: Optional[datetime] = None,
+    gate_exit: Optional[str] = None,
+    exit_event_id: Optional[uuid.UUID] = None,
+) -> ParkingSession:
+    # Caches are synchronous; a (rare) reload runs through the async connection
+    await db.run_sync(settle_session, session, exit_time, gate_exit, exit_event_id)
+    await db.commit()
+    await db.refresh(session)
+    return session
+
+
+async def get_open_session_async(db: AsyncSession, plate: str) -> Optional[ParkingSession]:
+    return (await db.execute(_open_session_query(plate))).scalars().first()
@@ -0,0 +1,148 @@
+"""Tariff cache — active tariffs compiled into an in-memory index for billing.
+
+Session close picks a tariff by vehicle type without querying: tariffs are
+indexed by vehicle type, night bands are parsed to hours once, and the
+``valid_from``/``valid_until`` window is checked in memory. The tariffs
+router calls ``invalidate`` after every write; the index is rebuilt on next
+use here and, through the cache bus, in every other worker. A rebuild every
+TARIFF_CACHE_TTL seconds bounds staleness if a message is missed.
+"""
+import logging
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from sqlalchemy.orm import Session as DBSession
+
+from app.config import settings
+from app.models.tariff import Tariff
+from app.services.cache_bus import CacheBus, cache_bus
+
+logger = logging.getLogger(__name__)
+
+
+def parse_hhmm(value: str) -> float:
+    """"HH:MM" → hours since midnight."""
+    hours, minutes = map(int, value.split(":"))
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise ValueError(f"Invalid time of day: {value}")
+    return hours + minutes / 60
+
+
+@dataclass(frozen=True)
+class CompiledTariff:
+    id: uuid.UUID
+    name: str
+    vehicle_types: FrozenSet[str]
+    first_hour_tnd: float
+    extra_hour_tnd: float
+    daily_max_tnd: float
+    night_multiplier: float
+    weekend_multiplier: float
+    # Night band in hours since midnight; None when the tariff's band is malformed
+    night_band: Optional[Tuple[float, float]]
+    valid_from: Optional[datetime]
+    valid_until: Optional[datetime]
+
+    @classmethod
+    def from_row(cls, t: Tariff) -> "CompiledTariff":
+        try:
+            night_band = (parse_hhmm(t.night_start), parse_hhmm(t.night_end))
+        except (ValueError, AttributeError):
+            logger.warning("Tariff %s has an invalid night band %r-%r; no night rate applied", t.name, t.night_start, t.night_end)
+            night_band = None
+        return cls(
+            id=t.id,
+            name=t.name,
+            vehicle_types=frozenset(t.vehicle_types or ()),
+            first_hour_tnd=t.first_hour_tnd,
+            extra_hour_tnd=t.extra_hour_tnd,
+            daily_max_tnd=t.daily_max_tnd,
+            night_multiplier=t.night_multiplier,
+            weekend_multiplier=t.weekend_multiplier,
+            night_band=night_band,
+            valid_from=t.valid_from,
+            valid_until=t.valid_until,
+        )
+
+    def valid_at(self, when: datetime) -> bool:
+        if self.valid_from is not None and when < self.valid_from:
+            return False
+        return self.valid_until is None or when < self.valid_until
+
+    def is_night(self, when: datetime) -> bool:
+        if self.night_band is None:
+            return False
+        start, end = self.night_band
+        hour = when.hour + when.minute / 60
+        if start > end:  # crosses midnight
+            return hour >= start or hour < end
+        return start <= hour < end
+
+
+@dataclass(frozen=True)
+class TariffIndex:
+    by_type: Dict[str, Tuple[CompiledTariff, ...]]
+    active: Tuple[CompiledTariff, ...]
+
+    def lookup(self, vehicle_type: str, when: datetime) -> Optional[CompiledTariff]:
+        """First active tariff for ``vehicle_type`` valid at ``when``, else any valid active tariff."""
+        for tariff in self.by_type.get(vehicle_type, ()):
+            if tariff.valid_at(when):
+                return tariff
+        for tariff in self.active:
+            if tariff.valid_at(when):
+                return tariff
+        return None
+
+
+class TariffCache:
+    def __init__(
+        self,
+        ttl: int = settings.TARIFF_CACHE_TTL,
+        channel: str = settings.TARIFF_CACHE_CHANNEL,
+        bus: CacheBus = cache_bus,
+    ):
+        self.ttl = ttl
+        self.channel = channel
+        self._bus = bus
+        self._index: Optional[TariffIndex] = None
+        self._loaded_at = float("-inf")
+        self._lock = threading.Lock()
+        bus.subscribe(channel, lambda data: self.expire(), self.expire)
+
+    def index(self, db: DBSession) -> TariffIndex:
+        index = self._index
+        if index is None or time.monotonic() - self._loaded_at > self.ttl:
+            index = self.rebuild(db)
+        return index
+
+    def rebuild(self, db: DBSession) -> TariffIndex:
+        """Compile all active tariffs in one query."""
+        self._loaded_at = time.monotonic()  # a write after this point expires the index again
+        rows = db.query(Tariff).filter(Tariff.active == True).order_by(Tariff.created_at).all()  # noqa: E712
+        active = tuple(CompiledTariff.from_row(t) for t in rows)
+        by_type: Dict[str, list] = {}
+        for tariff in active:
+            for vehicle_type in tariff.vehicle_types:
+                by_type.setdefault(vehicle_type, []).append(tariff)
+        index = TariffIndex({k: tuple(v) for k, v in by_type.items()}, active)
+        with self._lock:
+            self._index = index
+        logger.info("Tariff index built: %d active tariffs", len(active))
+        return index
+
+    def invalidate(self):
+        """Rebuild after a tariff write, here and (via the cache bus) in every other worker."""
+        self.expire()
+        if not self._bus.publish(self.channel, {}):
+            logger.warning("Other workers see this tariff change after their next rebuild (<= %ds)", self.ttl)
+
+    def expire(self):
+        self._loaded_at = float("-inf")
+
+
+tariff_cache = TariffCache()
@@ -0,0 +1,166 @@
+"""Vehicle registry cache — plate lookups for gate decisions without a DB round trip.
+
+The whole registry (only the fields access decisions need) is loaded once per
+worker process and kept in memory. Writes through the vehicles router
+invalidate the affected plates locally and publish them on the cache bus,
+so every other worker drops its copy too; a full reload every
+VEHICLE_CACHE_TTL seconds bounds staleness if a message is ever missed.
+Only one request reloads at a time — the others keep reading the previous
+copy meanwhile.
+"""
+import logging
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy.orm import Session as DBSession
+
+from app.config import settings
+from app.models.vehicle import Vehicle, VehicleCategory, VehicleType
+from app.services.cache_bus import CacheBus, cache_bus
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CachedVehicle:
+    """The part of a Vehicle row that access decisions and billing read."""
+    id: uuid.UUID
+    plate_normalized: str
+    category: VehicleCategory
+    vehicle_type: VehicleType
+    subscription_expires: Optional[datetime]
+
+
+_COLUMNS = (Vehicle.id, Vehicle.plate_normalized, Vehicle.category, Vehicle.vehicle_type, Vehicle.subscription_expires)
+
+
+class VehicleCache:
+    """Process-wide plate → vehicle map, authoritative for unknown plates once warmed."""
+
+    def __init__(
+        self,
+        ttl: int = settings.VEHICLE_CACHE_TTL,
+        channel: str = settings.VEHICLE_CACHE_CHANNEL,
+        bus: CacheBus = cache_bus,
+    ):
+        self.ttl = ttl
+        self.channel = channel
+        self._bus = bus
+        self._by_plate: Dict[str, CachedVehicle] = {}
+        self._by_id: Dict[uuid.UUID, CachedVehicle] = {}
+        # Plates invalidated since the last load — looked up again on next use —
+        # with the invalidation generation at which they were invalidated
+        self._dirty: Dict[str, int] = {}
+        # Plates invalidated while a reload is running (None when not reloading)
+        self._reloading: Optional[Dict[str, int]] = None
+        self._generation = 0
+        self._loaded = False
+        self._loaded_at = float("-inf")
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        bus.subscribe(channel, lambda data: self._invalidate_local(data.get("plates", [])), self.expire)
+
+    # ── Lookups ────────────────────────────────────────────────────────────
+    def get(self, db: DBSession, plate_normalized: str) -> Optional[CachedVehicle]:
+        """Return the vehicle registered under a normalized plate, or None."""
+        if time.monotonic() - self._loaded_at > self.ttl:
+            self._reload(db)
+        with self._lock:
+            if plate_normalized not in self._dirty:
+                self.hits += 1
+                return self._by_plate.get(plate_normalized)
+            generation = self._generation
+        self.misses += 1
+        row = db.query(*_COLUMNS).filter(Vehicle.plate_normalized == plate_normalized).first()
+        vehicle = CachedVehicle(*row) if row else None
+        with self._lock:
+            if self._dirty.get(plate_normalized, 0) <= generation:
+                self._dirty.pop(plate_normalized, None)
+                if vehicle is not None:
+                    self._store(vehicle)
+        return vehicle
+
+    def get_by_id(self, db: DBSession, vehicle_id) -> Optional[CachedVehicle]:
+        if not isinstance(vehicle_id, uuid.UUID):
+            vehicle_id = uuid.UUID(str(vehicle_id))
+        with self._lock:
+            vehicle = self._by_id.get(vehicle_id)
+            if vehicle is not None and vehicle.plate_normalized not in self._dirty:
+                self.hits += 1
+                return vehicle
+            generation = self._generation
+        self.misses += 1
+        row = db.query(*_COLUMNS).filter(Vehicle.id == vehicle_id).first()
+        if row is None:
+            return None
+        vehicle = CachedVehicle(*row)
+        with self._lock:
+            if self._dirty.get(vehicle.plate_normalized, 0) <= generation:
+                self._dirty.pop(vehicle.plate_normalized, None)
+                self._store(vehicle)
+        return vehicle
+
+    def _reload(self, db: DBSession):
+        """Single-flight TTL reload; until the first load completes every caller waits for it."""
+        if not self._reload_lock.acquire(blocking=not self._loaded):
+            return   # another request is reloading — serve the current copy
+        try:
+            if time.monotonic() - self._loaded_at > self.ttl:
+                self.warm(db)
+        finally:
+            self._reload_lock.release()
+
+    def warm(self, db: DBSession):
+        """(Re)load the whole registry in one query."""
+        with self._lock:
+            self._reloading = {}
+        rows = db.query(*_COLUMNS).all()
+        by_plate = {}
+        by_id = {}
+        for row in rows:
+            vehicle = CachedVehicle(*row)
+            by_plate[vehicle.plate_normalized] = vehicle
+            by_id[vehicle.id] = vehicle
+        with self._lock:
+            self._by_plate, self._by_id = by_plate, by_id
+            # Rows read before a concurrent write may be stale — keep those plates dirty
+            self._dirty, self._reloading = self._reloading or {}, None
+            self._loaded = True
+            self._loaded_at = time.monotonic()
+        logger.info("Vehicle cache loaded: %d vehicles", len(by_plate))
+
+    def _store(self, vehicle: CachedVehicle):
+        self._by_plate[vehicle.plate_normalized] = vehicle
+        self._by_id[vehicle.id] = vehicle
+
+    # ── Invalidation ───────────────────────────────────────────────────────
+    def invalidate(self, *plates: str):
+        """Drop plates after a registry write, here and (via the cache bus) in every other worker."""
+        plates = [p for p in plates if p]
+        self._invalidate_local(plates)
+        if not self._bus.publish(self.channel, {"plates": plates}):
+            logger.warning("Other workers see this vehicle change after their next reload (<= %ds)", self.ttl)
+
+    def expire(self):
+        """Force a full reload on the next lookup."""
+        self._loaded_at = float("-inf")
+
+    def _invalidate_local(self, plates: Iterable[str]):
+        with self._lock:
+            self._generation += 1
+            for plate in plates:
+                vehicle = self._by_plate.pop(plate, None)
+                if vehicle is not None:
+                    self._by_id.pop(vehicle.id, None)
+                self._dirty[plate] = self._generation
+                if self._reloading is not None:
+                    self._reloading[plate] = self._generation
+
+
+vehicle_cache = VehicleCache()
@@ -0,0 +1,133 @@
+"""Load test — gate decision latency of /api/vision/plate-event under burst traffic.
+
+Open-loop: requests are sent on a fixed schedule whatever the server's
+response time, and latency is measured from the scheduled send time, so
+queueing in the server (threadpool saturation on the sync path) shows up in
+the tail instead of silently lowering the request rate.
+
+Each simulated gate alternates entry and exit readings over its own plates,
+so sessions are opened and closed as in production.
+
+Usage:
+    # Two backends on the same database, one per plate-event path
+    ASYNC_PLATE_EVENTS=false uvicorn app.main:socket_app --port 8001
+    uvicorn app.main:socket_app --port 8000
+
+    # 40 gates, 400 events/s in total for 30 s, against each in turn
+    python -m bench.plate_event_load --target sync=http://localhost:8001 \\
+        --target async=http://localhost:8000 --gates 40 --rate 400 --duration 30
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import random
+import time
+from typing import Dict, List, Tuple
+
+import httpx
+
+
+def _plate_events(gate: int, plates: int):
+    """Endless entry/exit readings for the plates seen by one gate."""
+    pool = [f"{100 + gate} TU {1000 + i}" for i in range(plates)]
+    inside = set()
+    while True:
+        plate = random.choice(pool)
+        event_type = "exit" if plate in inside else "entry"
+        inside.symmetric_difference_update({plate})
+        yield {
+            "plate": plate,
+            "confidence": round(random.uniform(0.75, 0.99), 2),
+            "gate_id": f"bench_gate_{gate:02d}",
+            "vehicle_type": "car",
+            "event_type": event_type,
+        }
+
+
+async def run_target(url: str, gates: int, rate: float, duration: float, plates: int, timeout: float) -> Tuple[List[float], int]:
+    """Send ``rate`` events/s spread over ``gates`` for ``duration`` s; return latencies (ms) and errors."""
+    latencies: List[float] = []
+    errors = 0
+    interval = gates / rate   # per gate
+    endpoint = f"{url.rstrip('/')}/api/vision/plate-event"
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=gates)
+
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+        async def send(payload: dict, scheduled: float):
+            nonlocal errors
+            try:
+                resp = await client.post(endpoint, json=payload)
+                resp.raise_for_status()
+            except httpx.HTTPError:
+                errors += 1
+                return
+            latencies.append((time.perf_counter() - scheduled) * 1000)
+
+        async def gate_loop(gate: int, start: float, pending: List[asyncio.Task]):
+            events = _plate_events(gate, plates)
+            scheduled = start + random.uniform(0, interval)
+            while scheduled < start + duration:
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                pending.append(asyncio.create_task(send(next(events), scheduled)))
+                scheduled += interval
+
+        pending: List[asyncio.Task] = []
+        start = time.perf_counter() + 0.1
+        await asyncio.gather(*(gate_loop(g, start, pending) for g in range(gates)))
+        await asyncio.gather(*pending)
+    return latencies, errors
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    if not ordered:
+        return float("nan")
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+def summarize(name: str, latencies: List[float], errors: int, duration: float) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    return {
+        "target": name,
+        "ok": len(ordered),
+        "errors": errors,
+        "rps": len(ordered) / duration,
+        "p50": _percentile(ordered, 50),
+        "p95": _percentile(ordered, 95),
+        "p99": _percentile(ordered, 99),
+        "max": _percentile(ordered, 100),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", action="append", required=True, metavar="NAME=URL",
+                        help="backend base URL, e.g. async=http://localhost:8000 (repeatable)")
+    parser.add_argument("--gates", type=int, default=20, help="simulated gates posting concurrently")
+    parser.add_argument("--rate", type=float, default=200.0, help="events per second over all gates")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of load per target")
+    parser.add_argument("--plates", type=int, default=50, help="distinct plates per gate")
+    parser.add_argument("--warmup", type=float, default=3.0, help="seconds of unmeasured load per target first")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    args = parser.parse_args()
+
+    rows = []
+    for target in args.target:
+        name, _, url = target.partition("=")
+        if not url:
+            name, url = target, target
+        if args.warmup > 0:
+            asyncio.run(run_target(url, args.gates, args.rate, args.warmup, args.plates, args.timeout))
+        latencies, errors = asyncio.run(run_target(url, args.gates, args.rate, args.duration, args.plates, args.timeout))
+        rows.append(summarize(name, latencies, errors, args.duration))
+
+    print(f"\n{args.gates} gates, {args.rate:.0f} events/s offered, {args.duration:.0f}s per target")
+    print(f"{'target':<12}{'ok':>8}{'errors':>8}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for r in rows:
+        print(f"{r['target']:<12}{r['ok']:>8}{r['errors']:>8}{r['rps']:>9.1f}"
+              f"{r['p50']:>10.1f}{r['p95']:>10.1f}{r['p99']:>10.1f}{r['max']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import os
+import tempfile
+
+# Settings are read at import time: point the app at a throwaway SQLite file
+_db_dir = tempfile.mkdtemp(prefix="tunispark-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_dir}/test.db")
+os.environ.setdefault("SNAPSHOT_DIR", os.path.join(_db_dir, "snapshots"))
+os.environ.setdefault("ASYNC_PLATE_EVENTS", "false")
+os.environ.setdefault("REDIS_URL", "redis://localhost:1/0")
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.db import Base, SessionLocal, engine
+from app.models import vehicle, event, session, decision, tariff, rule, user, alert  # noqa: F401
+from app.models.tariff import Tariff
+from app.routers import vision
+from app.services.tariff_cache import tariff_cache
+from app.services.vehicle_cache import vehicle_cache
+
+
+@pytest.fixture
+def db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as session:
+        session.add(Tariff(
+            name="Standard", vehicle_types=["car"], first_hour_tnd=2.0, extra_hour_tnd=1.0,
+            daily_max_tnd=20.0, night_multiplier=1.0, weekend_multiplier=1.0,
+            night_start="22:00", night_end="06:00", active=True,
+        ))
+        session.commit()
+    vehicle_cache.expire()
+    tariff_cache.expire()
+    with SessionLocal() as session:
+        yield session
+
+
+@pytest.fixture
+def client(db):
+    app = FastAPI()
+    app.include_router(vision.router, prefix="/api/vision")
+    with TestClient(app) as c:
+        yield c
@@ -0,0 +1,30 @@
+from datetime import timezone
+
+from app.models.session import Session as ParkingSession
+from app.routers.vision import PlateEventIn
+
+
+def test_naive_captured_at_is_read_as_utc():
+    payload = PlateEventIn(plate="123 TN 4567", gate_id="gate_01", captured_at="2026-10-18T09:30:00")
+    assert payload.captured_at.tzinfo is not None
+    assert payload.captured_at.utcoffset() == timezone.utc.utcoffset(None)
+    assert payload.captured_at.hour == 9
+
+
+def test_entry_then_exit_with_naive_captured_at(client, db):
+    # The session opened by the entry holds a tz-aware entry_time; the exit's naive time must not break billing
+    events = [
+        {"plate": "123 TN 4567", "gate_id": "gate_01", "event_type": "entry", "captured_at": "2026-10-14T09:30:00+00:00"},
+        {"plate": "123 TN 4567", "gate_id": "gate_01", "event_type": "exit", "captured_at": "2026-10-14T11:00:00"},
+    ]
+    resp = client.post("/api/vision/plate-event/batch", json={"events": events})
+    assert resp.status_code == 200, resp.text
+
+    entry, exit_ = resp.json()["results"]
+    assert entry["session_id"] is not None
+    assert exit_["session_id"] == entry["session_id"]
+
+    parking_session = db.query(ParkingSession).one()
+    assert parking_session.exit_time is not None
+    assert parking_session.duration_minutes == 90
+    assert parking_session.amount_due == 2.5
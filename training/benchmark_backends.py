@@ -0,0 +1,69 @@
+"""Compare detector backends — CPU latency and mAP of .pt vs exported .onnx models.
+
+Usage:
+    python benchmark_backends.py --models models/plate_detector.pt \
+        models/plate_detector.onnx models/plate_detector.int8.onnx \
+        --data plates.yaml --images data/labeled/images/test
+
+Latency is measured through the vision ``PlateDetector`` (the code path the
+gates run); mAP through ``evaluate.evaluate_detector``, which validates
+``.onnx`` models with ONNX Runtime.
+"""
+from __future__ import annotations
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from evaluate import evaluate_detector  # noqa: E402
+
+
+def measure_latency(model_path: str, images_dir: str, limit: int = 100, batch: int = 1) -> np.ndarray:
+    """Return per-frame detection latency (ms) over up to ``limit`` images."""
+    from vision.detector.yolo_detector import PlateDetector
+
+    files = (sorted(Path(images_dir).glob("*.jpg")) + sorted(Path(images_dir).glob("*.png")))[:limit]
+    frames = [f for f in (cv2.imread(str(p)) for p in files) if f is not None]
+    if not frames:
+        raise SystemExit(f"No images in {images_dir}")
+
+    detector = PlateDetector(model_path)
+    detector.detect_batch(frames[:batch])  # warm-up
+    times = []
+    for i in range(0, len(frames), batch):
+        chunk = frames[i:i + batch]
+        t0 = time.perf_counter()
+        detector.detect_batch(chunk)
+        times.append((time.perf_counter() - t0) * 1000 / len(chunk))
+    return np.array(times)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--models", nargs="+", required=True, help=".pt and/or .onnx detector weights")
+    parser.add_argument("--data", default="plates.yaml")
+    parser.add_argument("--images", default="data/labeled/images/test")
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--batch", type=int, default=1, help="frames per forward pass (multi-stream)")
+    parser.add_argument("--skip-map", action="store_true", help="latency only")
+    args = parser.parse_args()
+
+    rows = []
+    for model_path in args.models:
+        t = measure_latency(model_path, args.images, args.limit, args.batch)
+        map50 = map5095 = float("nan")
+        if not args.skip_map:
+            metrics = evaluate_detector(model_path, args.data)
+            map50, map5095 = metrics.box.map50, metrics.box.map
+        rows.append((Path(model_path).name, t.mean(), np.percentile(t, 95), map50, map5095))
+
+    print("\n── Backend Comparison ────────────────────────────────────────────")
+    print(f"  {'model':<32}{'ms/frame':>10}{'p95':>8}{'mAP50':>8}{'mAP':>8}")
+    for name, mean, p95, map50, map5095 in rows:
+        print(f"  {name:<32}{mean:>10.1f}{p95:>8.1f}{map50:>8.4f}{map5095:>8.4f}")
+    print("──────────────────────────────────────────────────────────────────")
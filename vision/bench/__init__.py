@@ -0,0 +1 @@
+"""Benchmarks and soak checks for the vision pipeline."""
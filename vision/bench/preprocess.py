@@ -0,0 +1,109 @@
+"""Micro-benchmark — milliseconds per plate crop for each preprocessing tier.
+
+Usage:
+    # Crop plates out of a labeled YOLO split
+    python -m vision.bench.preprocess --images training/data/labeled/images/test \
+        --labels training/data/labeled/labels/test
+
+    # Or time a directory of ready-made plate crops, including EasyOCR
+    python -m vision.bench.preprocess --images crops/ --ocr
+"""
+from __future__ import annotations
+import argparse
+import time
+from pathlib import Path
+from typing import List
+
+import cv2
+import numpy as np
+
+from vision.ocr.preprocessor import TIERS, preprocess_plate
+
+
+def load_crops(images_dir: str, labels_dir: str | None = None, limit: int = 200) -> List[np.ndarray]:
+    """Load plate crops: whole images, or YOLO-labelled boxes cut out of them."""
+    image_files = sorted(Path(images_dir).glob("*.jpg")) + sorted(Path(images_dir).glob("*.png"))
+    crops = []
+    for img_path in image_files:
+        image = cv2.imread(str(img_path))
+        if image is None:
+            continue
+        if labels_dir is None:
+            crops.append(image)
+        else:
+            label_file = Path(labels_dir) / (img_path.stem + ".txt")
+            if not label_file.exists():
+                continue
+            h, w = image.shape[:2]
+            for line in label_file.read_text().splitlines():
+                parts = line.split()
+                if len(parts) < 5:
+                    continue
+                cx, cy, bw, bh = (float(p) for p in parts[1:5])
+                x1, y1 = max(0, int((cx - bw / 2) * w)), max(0, int((cy - bh / 2) * h))
+                x2, y2 = min(w, int((cx + bw / 2) * w)), min(h, int((cy + bh / 2) * h))
+                if x2 - x1 > 4 and y2 - y1 > 4:
+                    crops.append(image[y1:y2, x1:x2].copy())
+        if len(crops) >= limit:
+            break
+    return crops[:limit]
+
+
+def bench_tier(crops: List[np.ndarray], tier: str, repeat: int = 3) -> np.ndarray:
+    """Return per-crop preprocessing times (ms) for one tier."""
+    preprocess_plate(crops[0], tier)  # warm-up
+    times = []
+    for _ in range(repeat):
+        for crop in crops:
+            t0 = time.perf_counter()
+            preprocess_plate(crop, tier)
+            times.append((time.perf_counter() - t0) * 1000)
+    return np.array(times)
+
+
+def bench_ocr(crops: List[np.ndarray], tier: str) -> tuple:
+    """Return (ms per crop including recognition, mean confidence) for one tier."""
+    from vision.ocr.ocr_engine import read_plate
+
+    read_plate(crops[0], tier)  # warm-up (loads the reader)
+    times, confs = [], []
+    for crop in crops:
+        t0 = time.perf_counter()
+        _, conf = read_plate(crop, tier)
+        times.append((time.perf_counter() - t0) * 1000)
+        confs.append(conf)
+    return float(np.mean(times)), float(np.mean(confs))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", required=True)
+    parser.add_argument("--labels", default=None, help="YOLO label dir — crop plates out of full images")
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--ocr", action="store_true", help="also time EasyOCR recognition per tier")
+    args = parser.parse_args()
+
+    crops = load_crops(args.images, args.labels, args.limit)
+    if not crops:
+        print("No crops found.")
+        return
+
+    print(f"\nPreprocessing benchmark on {len(crops)} crops")
+    print("── Preprocessing (ms / crop) ─────────────────────")
+    print(f"  {'tier':<10}{'mean':>8}{'p50':>8}{'p95':>8}")
+    for tier in TIERS:
+        t = bench_tier(crops, tier, args.repeat)
+        print(f"  {tier:<10}{t.mean():>8.2f}{np.percentile(t, 50):>8.2f}{np.percentile(t, 95):>8.2f}")
+
+    if args.ocr:
+        print("── Preprocessing + OCR ───────────────────────────")
+        print(f"  {'tier':<10}{'ms':>8}{'conf':>8}")
+        for tier in TIERS:
+            ms, conf = bench_ocr(crops, tier)
+            print(f"  {tier:<10}{ms:>8.1f}{conf:>8.3f}")
+    print("──────────────────────────────────────────────────")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Replay benchmark — run recorded footage through detect → track → OCR → post.
+
+Events go to an in-memory stub poster, so neither Redis nor the backend is
+needed. Configurations are compared through the usual environment variables
+(OCR_TIER, OCR_MODE, MOTION_GATE, DETECT_EVERY_N, PLATE_MODEL_PATH, ...).
+
+Usage:
+    # As fast as possible — throughput and per-frame latency
+    python -m vision.bench.replay --source recordings/gate_01.mp4
+
+    # At the recording's frame rate, dropping frames like a live camera
+    python -m vision.bench.replay --source recordings/gate_01.mp4 --realtime
+
+    # Directory of frames, with out-of-process OCR
+    python -m vision.bench.replay --source frames/ --fps 10 --ocr-workers 2
+
+    # Compare tracker backends on the same footage
+    python -m vision.bench.replay --source recordings/gate_01.mp4 --tracker deepsort,sort
+"""
+from __future__ import annotations
+import argparse
+import time
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+
+from vision.camera.motion_gate import offset_boxes
+from vision.camera.replay import ReplayStream
+
+
+class StubPoster:
+    """Collect events in memory instead of posting them (no Redis, no HTTP)."""
+
+    def __init__(self):
+        self.events: List[dict] = []
+        self.plates: Set[str] = set()
+
+    def post_event(self, plate, plate_normalized, gate_id, ocr_confidence, vehicle_type, snapshot=None, **boxes) -> bool:
+        first = plate_normalized not in self.plates
+        self.plates.add(plate_normalized)
+        self.events.append({
+            "plate": plate,
+            "plate_normalized": plate_normalized,
+            "gate_id": gate_id,
+            "ocr_confidence": ocr_confidence,
+            "vehicle_type": vehicle_type,
+        })
+        return first
+
+    def close(self):
+        pass
+
+
+def _instrument_tracker(gate) -> Tuple[Set, List[float]]:
+    """Record confirmed track IDs (one per vehicle passage) and tracker time (ms) per call."""
+    seen: Set = set()
+    times: List[float] = []
+    update = gate.tracker.update
+
+    def counting_update(detections, frame):
+        t0 = time.perf_counter()
+        tracks = update(detections, frame)
+        times.append((time.perf_counter() - t0) * 1000)
+        seen.update(t.track_id for t in tracks if t.is_confirmed())
+        return tracks
+
+    gate.tracker.update = counting_update
+    return seen, times
+
+
+def run(args, tracker_backend: str | None = None) -> Dict[str, float]:
+    from vision.detector.yolo_detector import PlateDetector, VehicleClassifier
+    from vision.main import make_ocr_pool
+    from vision.pipeline import TRACKER_BACKEND, GatePipeline, make_tracker
+
+    stream = ReplayStream(args.source, realtime=args.realtime, fps=args.fps)
+    detector = PlateDetector()
+    poster = StubPoster()
+    ocr_pool = make_ocr_pool(args.ocr_workers)
+    tracker = make_tracker(backend=tracker_backend or TRACKER_BACKEND)
+    gate = GatePipeline(args.gate_id, VehicleClassifier(), poster, tracker=tracker, ocr_pool=ocr_pool)
+    vehicles, track_times = _instrument_tracker(gate)
+
+    stream.start()
+    latencies, last_seq, frames = [], 0, 0
+    t_start = time.perf_counter()
+    try:
+        while not stream.finished and (not args.limit or frames < args.limit):
+            frame = stream.read_new(last_seq, timeout=0.5)
+            if frame is None:
+                continue
+            last_seq = frame.seq
+            t0 = time.perf_counter()
+            region = gate.detection_region(frame.image)
+            if region is None:
+                gate.process(frame.image, [])
+            elif not gate.should_detect(frame.image):
+                gate.process_predicted(frame.image)
+            else:
+                image, offset = region
+                gate.process(frame.image, offset_boxes(detector.detect(image), offset))
+            latencies.append((time.perf_counter() - t0) * 1000)
+            frames += 1
+        wall = time.perf_counter() - t_start
+
+        last_image = stream.read()
+        if ocr_pool is not None and last_image is not None:
+            # Let in-flight OCR jobs land so their plates are counted
+            deadline = time.time() + 10
+            while ocr_pool.stats["in_flight"] + ocr_pool.stats["pending"] and time.time() < deadline:
+                time.sleep(0.05)
+                gate.process(last_image, [])
+        # Passages still open at end of stream are posted on shutdown, as in vision.main
+        gate.flush_passages()
+    finally:
+        stream.stop()
+        if ocr_pool is not None:
+            ocr_pool.shutdown()
+
+    lat = np.array(latencies) if latencies else np.zeros(1)
+    ocr_calls = gate.tracker.ocr_calls
+    return {
+        "frames": frames,
+        "predicted": gate.frames_predicted,
+        "dropped": max(0, last_seq - frames),
+        "fps": frames / wall if wall else 0.0,
+        "p50": float(np.percentile(lat, 50)),
+        "p95": float(np.percentile(lat, 95)),
+        "p99": float(np.percentile(lat, 99)),
+        "track_ms": float(np.mean(track_times)) if track_times else 0.0,
+        "vehicles": len(vehicles),
+        "ocr_calls": ocr_calls,
+        "ocr_per_vehicle": ocr_calls / len(vehicles) if vehicles else 0.0,
+        "events": len(poster.events),
+        "plates": len(poster.plates),
+        "plate_list": sorted(poster.plates),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--source", required=True, help="video file or image directory")
+    parser.add_argument("--realtime", action="store_true", help="pace at the recording's FPS and drop late frames")
+    parser.add_argument("--fps", type=float, default=None, help="frame rate for image dirs / override")
+    parser.add_argument("--limit", type=int, default=0, help="stop after N processed frames")
+    parser.add_argument("--gate-id", default="bench")
+    parser.add_argument("--ocr-workers", type=int, default=0)
+    parser.add_argument("--tracker", default=None, help="tracker backend(s), comma-separated: deepsort,sort")
+    parser.add_argument("--show-plates", action="store_true")
+    args = parser.parse_args()
+
+    backends = args.tracker.split(",") if args.tracker else [None]
+    results = {}
+    for backend in backends:
+        r = results[backend] = run(args, backend)
+        label = f", tracker {backend}" if backend else ""
+        print(f"\nReplay benchmark: {args.source} ({'real-time' if args.realtime else 'unthrottled'}{label})")
+        print("── Throughput ────────────────────────────────────")
+        print(f"  Frames processed   : {r['frames']} ({r['dropped']} dropped, {r['predicted']} without detection)")
+        print(f"  FPS                : {r['fps']:.1f}")
+        print(f"  Latency p50/95/99  : {r['p50']:.1f} / {r['p95']:.1f} / {r['p99']:.1f} ms")
+        print(f"  Tracker update     : {r['track_ms']:.2f} ms")
+        print("── Recognition ───────────────────────────────────")
+        print(f"  Vehicles (tracks)  : {r['vehicles']}")
+        print(f"  OCR calls          : {r['ocr_calls']} ({r['ocr_per_vehicle']:.1f} per vehicle)")
+        print(f"  Events / plates    : {r['events']} / {r['plates']}")
+        if args.show_plates:
+            for plate in r["plate_list"]:
+                print(f"    {plate}")
+        print("──────────────────────────────────────────────────")
+
+    if len(results) > 1:
+        print(f"\n  {'tracker':<10}{'fps':>8}{'p95 ms':>9}{'track ms':>10}{'tracks':>8}{'ocr/veh':>9}{'plates':>8}")
+        for backend, r in results.items():
+            print(f"  {backend:<10}{r['fps']:>8.1f}{r['p95']:>9.1f}{r['track_ms']:>10.2f}"
+                  f"{r['vehicles']:>8}{r['ocr_per_vehicle']:>9.1f}{r['plates']:>8}")
+
+
+if __name__ == "__main__":
+    main()
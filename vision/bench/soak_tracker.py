@@ -0,0 +1,122 @@
+"""Soak test — thousands of synthetic vehicles through PlateTracker, memory must stay flat.
+
+Each synthetic vehicle is a uniquely coloured plate box crossing the frame;
+a mean-colour embedder stands in for DeepSORT's CNN, so no model or GPU is
+needed. Every confirmed track gets the OCR-side state a real gate
+would write (plate cache, votes, skew, vehicle type).
+
+Usage:
+    python -m vision.bench.soak_tracker --vehicles 2000
+
+Exits non-zero if traced memory grows by more than ``--max-growth-kb``
+after warm-up, or any per-track state is left once every vehicle has gone.
+"""
+from __future__ import annotations
+import argparse
+import sys
+import tracemalloc
+
+import numpy as np
+
+from vision.tracker.deepsort_tracker import TRACKER_BACKENDS, PlateTracker
+
+_W, _H = 640, 360
+_PLATE_W, _PLATE_H = 60, 16
+
+
+class ColourEmbedder:
+    """Stand-in appearance model: the crop's normalized mean colour."""
+
+    def predict(self, crops):
+        embeds = []
+        for crop in crops:
+            mean = crop.reshape(-1, 3).mean(axis=0).astype(np.float32)
+            embeds.append(mean / (np.linalg.norm(mean) or 1.0))
+        return embeds
+
+
+def _colour(vehicle: int) -> tuple:
+    rng = np.random.default_rng(vehicle)
+    return tuple(int(v) for v in rng.integers(40, 255, size=3))
+
+
+def run(vehicles: int, concurrent: int, frames_per_vehicle: int, checkpoints: int, backend: str = "deepsort"):
+    tracker = PlateTracker(embedder=ColourEmbedder(), backend=backend)
+    frame = np.zeros((_H, _W, 3), np.uint8)
+    spacing = max(1, frames_per_vehicle // concurrent)
+    total_frames = vehicles * spacing + frames_per_vehicle + 60  # tail lets the last tracks expire
+    check_every = max(1, total_frames // checkpoints)
+    samples = []
+
+    tracemalloc.start()
+    for f in range(total_frames):
+        frame[:] = 0
+        detections = []
+        first = max(0, (f - frames_per_vehicle) // spacing + 1)
+        for vehicle in range(first, min(vehicles, f // spacing + 1)):
+            age = f - vehicle * spacing
+            if not 0 <= age < frames_per_vehicle:
+                continue
+            lane = vehicle % concurrent
+            x1 = int(age * (_W - _PLATE_W) / frames_per_vehicle)
+            y1 = 40 + lane * (_H - 80) // concurrent
+            frame[y1:y1 + _PLATE_H, x1:x1 + _PLATE_W] = _colour(vehicle)
+            detections.append(tracker.format_detection(x1, y1, x1 + _PLATE_W, y1 + _PLATE_H, 0.9))
+
+        for track in tracker.update(detections, frame):
+            if not track.is_confirmed() or track.time_since_update:
+                continue
+            tid = track.track_id
+            plate = f"{int(tid) % 9999}TN{int(tid) % 10000:04d}"
+            if tracker.should_ocr(tid, frame[:_PLATE_H, :_PLATE_W]):
+                tracker.vote_plate(tid, plate, 0.7)
+                tracker.cache_plate(tid, plate, 0.7)
+                tracker.record_reading(tid, plate, 0.7)
+                tracker.cache_skew(tid, 1.5)
+            if tracker.needs_vehicle_type(tid):
+                tracker.cache_vehicle_type(tid, "car", 0.8)
+
+        if f and f % check_every == 0:
+            current, _ = tracemalloc.get_traced_memory()
+            samples.append((f, current, len(tracker._plate_cache), tracker.ocr_stats["tracked"]))
+    tracemalloc.stop()
+    return tracker, samples
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vehicles", type=int, default=2000)
+    parser.add_argument("--concurrent", type=int, default=3, help="vehicles in frame at once")
+    parser.add_argument("--frames-per-vehicle", type=int, default=24)
+    parser.add_argument("--checkpoints", type=int, default=10)
+    parser.add_argument("--max-growth-kb", type=float, default=256)
+    parser.add_argument("--tracker", default="deepsort", choices=TRACKER_BACKENDS)
+    args = parser.parse_args()
+
+    tracker, samples = run(args.vehicles, args.concurrent, args.frames_per_vehicle, args.checkpoints, args.tracker)
+
+    print(f"\nTracker soak ({args.tracker}): {args.vehicles} vehicles, {args.concurrent} at a time")
+    print(f"  {'frame':>8}{'traced KB':>12}{'plates':>8}{'tracked':>9}")
+    for f, current, plates, tracked in samples:
+        print(f"  {f:>8}{current / 1024:>12.1f}{plates:>8}{tracked:>9}")
+
+    # Skip the first checkpoint (warm-up allocations); compare the later peak against it
+    baseline = samples[min(1, len(samples) - 1)][1]
+    growth_kb = (max(current for _, current, _, _ in samples[1:] or samples) - baseline) / 1024
+    stats = tracker.ocr_stats
+    print(f"  growth {growth_kb:.1f} KB, evicted by LRU {stats['evicted']}, tracks created {tracker._tracker.tracker._next_id - 1}")
+
+    failures = []
+    if growth_kb > args.max_growth_kb:
+        failures.append(f"memory grew {growth_kb:.1f} KB (> {args.max_growth_kb} KB)")
+    if stats["tracked"] or tracker._plate_cache:
+        failures.append(f"state kept for {stats['tracked']} tracks after all vehicles left")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
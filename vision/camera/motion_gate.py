@@ -0,0 +1,121 @@
+"""Motion / ROI gate — skip detection on frames where nothing moves in the lane."""
+from __future__ import annotations
+from typing import List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+Point = Tuple[int, int]
+
+
+def parse_roi(value: str) -> Optional[List[Point]]:
+    """Parse "x,y;x,y;x,y" (frame pixels) into a polygon, or None if empty."""
+    value = value.strip()
+    if not value:
+        return None
+    points = []
+    for pair in value.split(";"):
+        x, y = pair.split(",")
+        points.append((int(x), int(y)))
+    if len(points) < 3:
+        raise ValueError(f"Lane ROI needs at least 3 points: {value}")
+    return points
+
+
+def offset_boxes(boxes: list, offset: Point) -> list:
+    """Shift (x1, y1, x2, y2, conf) boxes detected on an ROI crop back to frame coordinates."""
+    ox, oy = offset
+    if not ox and not oy:
+        return boxes
+    return [(x1 + ox, y1 + oy, x2 + ox, y2 + oy, conf) for (x1, y1, x2, y2, conf) in boxes]
+
+
+class MotionGate:
+    """Cheap pre-filter in front of the plate detector.
+
+    Frames are cropped to the bounding box of the lane ROI polygon,
+    downscaled, and compared against a running-average background. Only
+    pixels inside the polygon count. After motion the gate stays open for
+    ``hold_frames`` frames so a car that stops at the barrier is still seen.
+    """
+
+    def __init__(
+        self,
+        roi: Optional[Sequence[Point]] = None,
+        scale: float = 0.25,
+        pixel_threshold: int = 25,
+        min_area_ratio: float = 0.002,
+        hold_frames: int = 20,
+        learning_rate: float = 0.05,
+    ):
+        self.roi = list(roi) if roi else None
+        self.scale = scale
+        self.pixel_threshold = pixel_threshold
+        self.min_area_ratio = min_area_ratio
+        self.hold_frames = hold_frames
+        self.learning_rate = learning_rate
+        self._frame_shape: Optional[tuple] = None
+        self._rect: Tuple[int, int, int, int] = (0, 0, 0, 0)   # x, y, w, h
+        self._mask: Optional[np.ndarray] = None
+        self._mask_area = 1
+        self._background: Optional[np.ndarray] = None
+        self._hold = 0
+        self.frames_seen = 0
+        self.frames_skipped = 0
+
+    def _bind(self, shape: tuple):
+        """(Re)compute the ROI rectangle and downscaled mask for a frame size."""
+        h, w = shape[:2]
+        if self.roi:
+            pts = np.array(self.roi, dtype=np.int32)
+            pts[:, 0] = pts[:, 0].clip(0, w - 1)
+            pts[:, 1] = pts[:, 1].clip(0, h - 1)
+            x, y, rw, rh = cv2.boundingRect(pts)
+        else:
+            pts, (x, y, rw, rh) = None, (0, 0, w, h)
+        self._rect = (x, y, rw, rh)
+        small = (max(1, int(rw * self.scale)), max(1, int(rh * self.scale)))
+        mask = np.zeros((small[1], small[0]), dtype=np.uint8)
+        if pts is None:
+            mask[:] = 255
+        else:
+            local = ((pts - [x, y]) * self.scale).astype(np.int32)
+            cv2.fillPoly(mask, [local], 255)
+        self._mask = mask
+        self._mask_area = max(1, cv2.countNonZero(mask))
+        self._background = None
+        self._frame_shape = shape
+
+    def crop(self, frame: np.ndarray) -> Tuple[np.ndarray, Point]:
+        """Return the ROI bounding-box view of ``frame`` and its (x, y) offset."""
+        if self._frame_shape != frame.shape:
+            self._bind(frame.shape)
+        x, y, w, h = self._rect
+        return frame[y:y + h, x:x + w], (x, y)
+
+    def has_motion(self, frame: np.ndarray) -> bool:
+        """Update the background model and return True if the lane is active."""
+        region, _ = self.crop(frame)
+        gray = cv2.cvtColor(region, cv2.COLOR_BGR2GRAY) if region.ndim == 3 else region
+        small = cv2.resize(gray, (self._mask.shape[1], self._mask.shape[0]), interpolation=cv2.INTER_AREA)
+        small = cv2.GaussianBlur(small, (5, 5), 0).astype(np.float32)
+        self.frames_seen += 1
+
+        if self._background is None:
+            self._background = small
+            self._hold = self.hold_frames
+            return True
+
+        diff = cv2.absdiff(small, self._background)
+        cv2.accumulateWeighted(small, self._background, self.learning_rate)
+        moving = cv2.countNonZero(cv2.bitwise_and(
+            (diff > self.pixel_threshold).astype(np.uint8) * 255, self._mask
+        ))
+        if moving / self._mask_area >= self.min_area_ratio:
+            self._hold = self.hold_frames
+            return True
+        if self._hold > 0:
+            self._hold -= 1
+            return True
+        self.frames_skipped += 1
+        return False
@@ -0,0 +1,48 @@
+"""Multi-camera capture — one StreamHandler per gate, read together for batching."""
+from __future__ import annotations
+import logging
+from typing import Dict, Mapping
+
+from vision.camera.stream_handler import Frame, StreamHandler
+
+logger = logging.getLogger(__name__)
+
+
+class MultiStreamHandler:
+    """Own several StreamHandlers and hand out their latest frames together."""
+
+    def __init__(self, sources: Mapping[str, str | int], fps_limit: int = 10):
+        # stream_id → handler (stream_id is usually the gate ID)
+        self._streams: Dict[str, StreamHandler] = {
+            stream_id: StreamHandler(source, fps_limit=fps_limit)
+            for stream_id, source in sources.items()
+        }
+        # stream_id → sequence number of the last frame handed out
+        self._last_seq: Dict[str, int] = {stream_id: 0 for stream_id in self._streams}
+
+    def start(self):
+        for stream_id, stream in self._streams.items():
+            stream.start()
+            logger.info("Stream opened: %s → %s", stream_id, stream.source)
+
+    def stop(self):
+        for stream in self._streams.values():
+            stream.stop()
+
+    def read_latest(self) -> Dict[str, Frame]:
+        """Return the latest unseen frame of every stream that has one, keyed by stream ID.
+
+        Streams whose newest frame was already returned are left out, so the
+        same image is never detected twice.
+        """
+        frames = {}
+        for stream_id, stream in self._streams.items():
+            frame = stream.read_new(self._last_seq[stream_id])
+            if frame is not None:
+                self._last_seq[stream_id] = frame.seq
+                frames[stream_id] = frame
+        return frames
+
+    @property
+    def stream_ids(self) -> list:
+        return list(self._streams)
@@ -0,0 +1,132 @@
+"""Replay recorded video files or image directories as a StreamHandler-compatible source."""
+from __future__ import annotations
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import cv2
+import numpy as np
+
+from vision.camera.stream_handler import Frame
+
+_IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+class ReplayStream:
+    """Serve frames of a recording through the ``read_new()`` interface.
+
+    Unthrottled (``realtime=False``) every frame is returned exactly once,
+    as fast as the consumer asks — throughput measurements. In real-time
+    mode frames are due at the recording's frame rate and ones the consumer
+    is too slow for are skipped, like a live camera would drop them.
+
+    ``finished`` turns True once the recording is exhausted.
+    """
+
+    def __init__(self, source: str, realtime: bool = False, fps: float | None = None, loop: bool = False):
+        self.source = source
+        self.realtime = realtime
+        self.loop = loop
+        self._images: Optional[List[Path]] = None
+        self._cap: Optional[cv2.VideoCapture] = None
+        self._fps = fps
+        self._index = 0          # frames consumed so far (also the last sequence number)
+        self._pos = 0            # position in the image list
+        self._start = 0.0
+        self._last: Optional[np.ndarray] = None
+        self.finished = False
+
+    def start(self):
+        path = Path(self.source)
+        if path.is_dir():
+            self._images = sorted(p for p in path.iterdir() if p.suffix.lower() in _IMAGE_SUFFIXES)
+            if not self._images:
+                raise RuntimeError(f"No images in {self.source}")
+            self._fps = self._fps or 10.0
+        else:
+            self._cap = cv2.VideoCapture(str(path))
+            if not self._cap.isOpened():
+                raise RuntimeError(f"Cannot open video source: {self.source}")
+            self._fps = self._fps or self._cap.get(cv2.CAP_PROP_FPS) or 25.0
+        self._start = time.time()
+
+    def stop(self):
+        if self._cap is not None:
+            self._cap.release()
+
+    @property
+    def fps(self) -> float:
+        return self._fps or 0.0
+
+    def read_new(self, after_seq: int = 0, timeout: float = 0.0) -> Optional[Frame]:
+        """Return the next due frame newer than ``after_seq``, or None.
+
+        In real-time mode waits up to ``timeout`` seconds for the next frame
+        to become due.
+        """
+        if self.finished:
+            return None
+        target = max(after_seq, self._index) + 1
+        if self.realtime:
+            due = self._start + (target - 1) / self._fps
+            wait = due - time.time()
+            if wait > timeout:
+                time.sleep(max(0.0, timeout))
+                return None
+            if wait > 0:
+                time.sleep(wait)
+            # Skip frames that fell due while the consumer was busy
+            target = max(target, int((time.time() - self._start) * self._fps) + 1)
+        while self._index < target:
+            skip = self._index < target - 1
+            image = self._decode(skip)
+            if self.finished:
+                return None
+            if skip:
+                continue
+            if image is None:
+                # Unreadable frame — serve the next one instead
+                target = self._index + 1
+                continue
+            self._last = image
+        timestamp = self._start + (self._index - 1) / self._fps if self.realtime else time.time()
+        image = self._last.view()
+        image.flags.writeable = False
+        return Frame(self._index, timestamp, image)
+
+    def read(self) -> Optional[np.ndarray]:
+        return None if self._last is None else self._last.copy()
+
+    @property
+    def last_seq(self) -> int:
+        return self._index
+
+    @property
+    def is_open(self) -> bool:
+        return not self.finished
+
+    def _decode(self, skip: bool = False) -> Optional[np.ndarray]:
+        """Advance one frame; skipped frames are not decoded (returns None for them)."""
+        if self._images is not None:
+            if self._pos >= len(self._images):
+                if not self.loop:
+                    self.finished = True
+                    return None
+                self._pos = 0
+            path = self._images[self._pos]
+            self._pos += 1
+            self._index += 1
+            return None if skip else cv2.imread(str(path))
+
+        ok = self._cap.grab()
+        if not ok and self.loop:
+            self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok = self._cap.grab()
+        if not ok:
+            self.finished = True
+            return None
+        self._index += 1
+        if skip:
+            return None
+        ok, image = self._cap.retrieve()
+        return image if ok else None
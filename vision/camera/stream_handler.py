@@ -2,20 +2,45 @@
 from __future__ import annotations
 import time
 import threading
-from typing import Optional
+from typing import NamedTuple, Optional
 import cv2
 import numpy as np
 
 
+class Frame(NamedTuple):
+    """A captured frame: monotonic sequence number, capture time and pixels.
+
+    ``image`` is a read-only view into the capture ring buffer; copy it if it
+    must outlive the next ``read_new()`` call.
+    """
+    seq: int
+    timestamp: float
+    image: np.ndarray
+
+
 class StreamHandler:
-    """Thread-safe RTSP/webcam capture with double-buffering."""
+    """Thread-safe RTSP/webcam capture into a preallocated ring buffer.
 
-    def __init__(self, source: str | int, fps_limit: int = 10):
+    Frames are decoded straight into ring slots and numbered 1, 2, 3, ...
+    The slot last handed out by ``read_new()`` is never overwritten, so a
+    single consumer can hold its frame for as long as it needs without
+    copying it.
+    """
+
+    def __init__(self, source: str | int, fps_limit: int = 10, ring_size: int = 4):
+        if ring_size < 3:
+            raise ValueError("ring_size must be at least 3")
         self.source = source
         self.fps_limit = fps_limit
+        self.ring_size = ring_size
         self._cap: Optional[cv2.VideoCapture] = None
-        self._frame: Optional[np.ndarray] = None
-        self._lock = threading.Lock()
+        self._ring: Optional[np.ndarray] = None        # (ring_size, H, W, C)
+        self._slot_seq = [0] * ring_size
+        self._slot_time = [0.0] * ring_size
+        self._latest_slot = -1
+        self._leased_slot = -1
+        self._seq = 0
+        self._cond = threading.Condition()
         self._running = False
         self._thread: Optional[threading.Thread] = None
 
@@ -38,17 +63,65 @@ class StreamHandler:
         interval = 1.0 / self.fps_limit
         while self._running:
             t0 = time.time()
-            ret, frame = self._cap.read()
+            slot = self._next_slot()
+            if self._ring is None:
+                ret, frame = self._cap.read()
+            else:
+                ret, frame = self._cap.read(self._ring[slot])
             if ret:
-                with self._lock:
-                    self._frame = frame
+                self._store(slot, frame, t0)
             elapsed = time.time() - t0
             time.sleep(max(0.0, interval - elapsed))
 
+    def _next_slot(self) -> int:
+        with self._cond:
+            slot = (self._latest_slot + 1) % self.ring_size
+            if slot == self._leased_slot:
+                slot = (slot + 1) % self.ring_size
+            return slot
+
+    def _store(self, slot: int, frame: np.ndarray, timestamp: float):
+        with self._cond:
+            if self._ring is None or self._ring.shape[1:] != frame.shape or self._ring.dtype != frame.dtype:
+                # First frame, or the source changed resolution — (re)allocate the ring
+                self._ring = np.empty((self.ring_size, *frame.shape), dtype=frame.dtype)
+                self._leased_slot = -1
+            if not np.shares_memory(frame, self._ring[slot]):
+                self._ring[slot] = frame
+            self._seq += 1
+            self._slot_seq[slot] = self._seq
+            self._slot_time[slot] = timestamp
+            self._latest_slot = slot
+            self._cond.notify_all()
+
+    def read_new(self, after_seq: int = 0, timeout: float = 0.0) -> Optional[Frame]:
+        """Return the latest frame if it is newer than ``after_seq``, else None.
+
+        Waits up to ``timeout`` seconds for a new frame. The returned image is
+        a read-only view, valid until the next ``read_new()`` call.
+        """
+        with self._cond:
+            if self._seq <= after_seq and timeout > 0:
+                self._cond.wait_for(lambda: self._seq > after_seq, timeout=timeout)
+            if self._seq <= after_seq or self._latest_slot < 0:
+                return None
+            slot = self._latest_slot
+            self._leased_slot = slot
+            image = self._ring[slot].view()
+            image.flags.writeable = False
+            return Frame(self._slot_seq[slot], self._slot_time[slot], image)
+
     def read(self) -> Optional[np.ndarray]:
-        """Return the latest frame (or None if not yet available)."""
-        with self._lock:
-            return self._frame.copy() if self._frame is not None else None
+        """Return a copy of the latest frame (or None if not yet available)."""
+        with self._cond:
+            if self._latest_slot < 0:
+                return None
+            return self._ring[self._latest_slot].copy()
+
+    @property
+    def last_seq(self) -> int:
+        """Sequence number of the most recently captured frame (0 before the first)."""
+        return self._seq
 
     @property
     def is_open(self) -> bool:
@@ -0,0 +1,126 @@
+"""Export YOLOv8 weights to ONNX, optionally INT8-quantized for CPU inference.
+
+Usage:
+    # FP32 ONNX with a dynamic batch axis (for multi-stream detect_batch)
+    python -m vision.detector.export --weights models/plate_detector.pt
+
+    # INT8 static quantization, calibrated on our own plate images
+    python -m vision.detector.export --weights models/plate_detector.pt \
+        --int8 --calib training/data/labeled/images/train
+
+Then point PLATE_MODEL_PATH (or VEHICLE_MODEL_PATH) at the produced ``.onnx``.
+"""
+from __future__ import annotations
+import argparse
+import random
+from pathlib import Path
+from typing import List
+
+import cv2
+
+
+def export_onnx(weights: str, imgsz: int = 640, dynamic: bool = True) -> str:
+    """Export ``weights`` to ONNX next to the ``.pt`` file; return the new path."""
+    from ultralytics import YOLO
+
+    return YOLO(weights).export(format="onnx", imgsz=imgsz, dynamic=dynamic, simplify=True)
+
+
+def _calibration_images(calib_dir: str, limit: int) -> List[Path]:
+    files = sorted(Path(calib_dir).glob("*.jpg")) + sorted(Path(calib_dir).glob("*.png"))
+    random.Random(0).shuffle(files)
+    return files[:limit]
+
+
+class _PlateCalibrationReader:
+    """Feed letterboxed calibration images to ``quantize_static`` one at a time."""
+
+    def __init__(self, files: List[Path], input_name: str, imgsz: int):
+        from vision.detector.onnx_backend import letterbox, to_blob
+
+        self._letterbox, self._to_blob = letterbox, to_blob
+        self._files = iter(files)
+        self._input_name = input_name
+        self._imgsz = imgsz
+
+    def get_next(self):
+        for path in self._files:
+            image = cv2.imread(str(path))
+            if image is None:
+                continue
+            padded, _, _ = self._letterbox(image, self._imgsz)
+            return {self._input_name: self._to_blob([padded])}
+        return None
+
+
+def quantize_int8(onnx_path: str, calib_dir: str, imgsz: int = 640, limit: int = 300) -> str:
+    """Write ``<name>.int8.onnx`` statically quantized on images from ``calib_dir``."""
+    import onnx
+    from onnxruntime.quantization import CalibrationMethod, QuantFormat, QuantType, quantize_static
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    files = _calibration_images(calib_dir, limit)
+    if not files:
+        raise SystemExit(f"No calibration images in {calib_dir}")
+
+    src = Path(onnx_path)
+    prepared = src.with_suffix(".prep.onnx")
+    out = src.with_suffix(".int8.onnx")
+    quant_pre_process(str(src), str(prepared))
+    input_name = onnx.load(str(prepared)).graph.input[0].name
+
+    quantize_static(
+        str(prepared),
+        str(out),
+        _PlateCalibrationReader(files, input_name, imgsz),
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=True,
+        calibrate_method=CalibrationMethod.MinMax,
+        # Keep the detection head in float: quantizing the final box/score
+        # concat costs noticeably more mAP than it saves in latency
+        nodes_to_exclude=_head_nodes(str(prepared)),
+    )
+    # ultralytics metadata (names, imgsz, stride) is needed by OnnxYOLO and val()
+    model = onnx.load(str(out))
+    for prop in onnx.load(str(src)).metadata_props:
+        model.metadata_props.add(key=prop.key, value=prop.value)
+    onnx.save(model, str(out))
+    prepared.unlink(missing_ok=True)
+    print(f"INT8 model ({len(files)} calibration images): {out}")
+    return str(out)
+
+
+def _head_nodes(onnx_path: str) -> List[str]:
+    """Names of the Detect module's decode ops (DFL, anchors, concat, sigmoid)."""
+    import onnx
+
+    nodes = onnx.load(onnx_path).graph.node
+    # ultralytics names nodes "/model.<i>/<op>"; the last node belongs to Detect
+    parts = nodes[-1].name.split("/")
+    if len(parts) < 3:
+        return []
+    prefix = f"/{parts[1]}/"
+    # Keep the cv2/cv3 conv branches quantized, exclude everything after them
+    return [n.name for n in nodes if n.name.startswith(prefix) and not n.name.startswith((prefix + "cv2", prefix + "cv3"))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--weights", required=True, help=".pt weights to export")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--static-batch", action="store_true", help="export with a fixed batch of 1")
+    parser.add_argument("--int8", action="store_true", help="also write an INT8 statically quantized model")
+    parser.add_argument("--calib", default="training/data/labeled/images/train", help="calibration image dir")
+    parser.add_argument("--calib-limit", type=int, default=300)
+    args = parser.parse_args()
+
+    onnx_path = export_onnx(args.weights, args.imgsz, dynamic=not args.static_batch)
+    print(f"ONNX model: {onnx_path}")
+    if args.int8:
+        quantize_int8(onnx_path, args.calib, args.imgsz, args.calib_limit)
+
+
+if __name__ == "__main__":
+    main()
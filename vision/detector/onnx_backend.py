@@ -0,0 +1,110 @@
+"""ONNX Runtime inference backend for exported YOLOv8 detectors (no torch needed).
+
+Models are produced by ``python -m vision.detector.export`` and selected by
+pointing PLATE_MODEL_PATH / VEHICLE_MODEL_PATH at the ``.onnx`` file.
+ONNX_PROVIDER=openvino runs them through the OpenVINO execution provider
+(requires the onnxruntime-openvino build).
+"""
+from __future__ import annotations
+import ast
+import os
+from typing import Dict, List, Sequence, Tuple
+
+import cv2
+import numpy as np
+import onnxruntime as ort
+
+ONNX_PROVIDER = os.getenv("ONNX_PROVIDER", "cpu")       # "cpu" | "openvino"
+ONNX_THREADS = int(os.getenv("ONNX_THREADS", "0"))       # 0 = onnxruntime default
+
+# (x1, y1, x2, y2, confidence, class_id)
+RawBox = Tuple[int, int, int, int, float, int]
+
+
+def letterbox(image: np.ndarray, size: int) -> Tuple[np.ndarray, float, Tuple[float, float]]:
+    """Resize keeping aspect ratio and pad to ``size``×``size`` (YOLO grey padding).
+
+    Returns (padded image, scale ratio, (pad_x, pad_y)).
+    """
+    h, w = image.shape[:2]
+    ratio = min(size / h, size / w)
+    new_w, new_h = int(round(w * ratio)), int(round(h * ratio))
+    pad_x, pad_y = (size - new_w) / 2, (size - new_h) / 2
+    resized = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    top, bottom = int(round(pad_y - 0.1)), int(round(pad_y + 0.1))
+    left, right = int(round(pad_x - 0.1)), int(round(pad_x + 0.1))
+    padded = cv2.copyMakeBorder(resized, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(114, 114, 114))
+    return padded, ratio, (left, top)
+
+
+def to_blob(images: Sequence[np.ndarray]) -> np.ndarray:
+    """Stack letterboxed BGR images into an NCHW float32 RGB blob in [0, 1]."""
+    batch = np.stack(images)[..., ::-1].transpose(0, 3, 1, 2)
+    return np.ascontiguousarray(batch, dtype=np.float32) / 255.0
+
+
+class OnnxYOLO:
+    """Run a YOLOv8 detection model exported to ONNX."""
+
+    def __init__(self, model_path: str, iou: float = 0.7):
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if ONNX_THREADS:
+            options.intra_op_num_threads = ONNX_THREADS
+        if ONNX_PROVIDER == "openvino":
+            providers = [("OpenVINOExecutionProvider", {"device_type": "CPU"}), "CPUExecutionProvider"]
+        else:
+            providers = ["CPUExecutionProvider"]
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=providers)
+        self.iou = iou
+
+        inp = self.session.get_inputs()[0]
+        self._input_name = inp.name
+        self.dynamic_batch = not isinstance(inp.shape[0], int)
+        meta = self.session.get_modelmeta().custom_metadata_map
+        if isinstance(inp.shape[2], int):
+            self.imgsz = inp.shape[2]
+        else:
+            self.imgsz = int(ast.literal_eval(meta.get("imgsz", "[640, 640]"))[0])
+        self.names: Dict[int, str] = ast.literal_eval(meta["names"]) if "names" in meta else {0: "object"}
+
+    def predict(self, frames: Sequence[np.ndarray], conf: float) -> List[List[RawBox]]:
+        """Return one list of boxes per frame, in input order."""
+        boxed = [letterbox(f, self.imgsz) for f in frames]
+        blob = to_blob([b[0] for b in boxed])
+        if self.dynamic_batch:
+            outputs = self.session.run(None, {self._input_name: blob})[0]
+        else:
+            outputs = np.concatenate(
+                [self.session.run(None, {self._input_name: blob[i:i + 1]})[0] for i in range(len(blob))]
+            )
+        return [
+            self._decode(out, conf, ratio, pad, frame.shape)
+            for out, (_, ratio, pad), frame in zip(outputs, boxed, frames)
+        ]
+
+    def _decode(self, output: np.ndarray, conf: float, ratio: float, pad: Tuple[float, float], shape) -> List[RawBox]:
+        # YOLOv8 head: (4 + num_classes, anchors) with boxes as centre-x, centre-y, w, h
+        preds = output.T
+        class_scores = preds[:, 4:]
+        class_ids = class_scores.argmax(axis=1)
+        scores = class_scores[np.arange(len(preds)), class_ids]
+        keep = scores >= conf
+        if not keep.any():
+            return []
+        preds, scores, class_ids = preds[keep], scores[keep], class_ids[keep]
+
+        cx, cy, w, h = preds[:, 0], preds[:, 1], preds[:, 2], preds[:, 3]
+        boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+        boxes[:, [0, 2]] = ((boxes[:, [0, 2]] - pad[0]) / ratio).clip(0, shape[1])
+        boxes[:, [1, 3]] = ((boxes[:, [1, 3]] - pad[1]) / ratio).clip(0, shape[0])
+
+        # Class-aware NMS: offset boxes per class so different classes never suppress each other
+        offset = class_ids[:, None] * 4096.0
+        shifted = boxes + offset
+        xywh = np.column_stack([shifted[:, 0], shifted[:, 1], shifted[:, 2] - shifted[:, 0], shifted[:, 3] - shifted[:, 1]])
+        indices = cv2.dnn.NMSBoxes(xywh.tolist(), scores.tolist(), conf, self.iou)
+        return [
+            (*map(int, boxes[i]), float(scores[i]), int(class_ids[i]))
+            for i in np.array(indices).reshape(-1)
+        ]
@@ -1,10 +1,14 @@
-"""YOLOv8-based license plate and vehicle detector."""
+"""YOLOv8-based license plate and vehicle detector.
+
+``.pt`` weights run through ultralytics/PyTorch; ``.onnx`` exports (see
+``vision.detector.export``) run through ONNX Runtime or OpenVINO on the CPU
+behind the same interface.
+"""
 from __future__ import annotations
 import os
-from typing import List, Tuple
+from typing import Dict, List, Mapping, Sequence, Tuple
 
 import numpy as np
-from ultralytics import YOLO
 
 
 # Default model weights — override via env var PLATE_MODEL_PATH / VEHICLE_MODEL_PATH
@@ -14,22 +18,58 @@ VEHICLE_MODEL_PATH = os.getenv("VEHICLE_MODEL_PATH", "models/vehicle_classifier.
 VEHICLE_CLASSES = ["car", "truck", "bus", "motorcycle", "van"]
 
 
+def _is_onnx(model_path: str) -> bool:
+    return model_path.lower().endswith(".onnx")
+
+
+def _load_model(model_path: str):
+    """Load an ONNX Runtime session for ``.onnx`` files, else an ultralytics model."""
+    if _is_onnx(model_path):
+        from vision.detector.onnx_backend import OnnxYOLO
+        return OnnxYOLO(model_path)
+    from ultralytics import YOLO
+    return YOLO(model_path)
+
+
 class PlateDetector:
     """Detect license plates in a frame using YOLOv8."""
 
     def __init__(self, model_path: str = PLATE_MODEL_PATH, conf: float = 0.4):
-        self.model = YOLO(model_path)
+        self.model = _load_model(model_path)
+        self.onnx = _is_onnx(model_path)
         self.conf = conf
 
     def detect(self, frame: np.ndarray) -> List[Tuple[int, int, int, int, float]]:
         """Run detection and return list of (x1, y1, x2, y2, confidence)."""
-        results = self.model.predict(frame, conf=self.conf, verbose=False)
+        return self.detect_batch([frame])[0]
+
+    def detect_batch(self, frames: Sequence[np.ndarray]) -> List[List[Tuple[int, int, int, int, float]]]:
+        """Run a single forward pass over several frames.
+
+        Returns one detection list per frame, in input order.
+        """
+        if not frames:
+            return []
+        if self.onnx:
+            return [[box[:5] for box in boxes] for boxes in self.model.predict(frames, self.conf)]
+        results = self.model.predict(list(frames), conf=self.conf, verbose=False)
+        return [self._parse(r) for r in results]
+
+    def detect_streams(
+        self, frames: Mapping[str, np.ndarray]
+    ) -> Dict[str, List[Tuple[int, int, int, int, float]]]:
+        """Batch-detect the latest frame of each stream, keyed by stream ID."""
+        keys = list(frames)
+        batched = self.detect_batch([frames[k] for k in keys])
+        return dict(zip(keys, batched))
+
+    @staticmethod
+    def _parse(result) -> List[Tuple[int, int, int, int, float]]:
         detections = []
-        for r in results:
-            for box in r.boxes:
-                x1, y1, x2, y2 = map(int, box.xyxy[0].tolist())
-                conf = float(box.conf[0])
-                detections.append((x1, y1, x2, y2, conf))
+        for box in result.boxes:
+            x1, y1, x2, y2 = map(int, box.xyxy[0].tolist())
+            conf = float(box.conf[0])
+            detections.append((x1, y1, x2, y2, conf))
         return detections
 
 
@@ -38,26 +78,73 @@ class VehicleClassifier:
 
     def __init__(self, model_path: str = VEHICLE_MODEL_PATH, conf: float = 0.3):
         if os.path.exists(model_path):
-            self.model = YOLO(model_path)
+            self.model = _load_model(model_path)
         else:
             # Fall back to COCO-pretrained model for prototype
-            self.model = YOLO("yolov8n.pt")
+            self.model = _load_model("yolov8n.pt")
+        self.onnx = _is_onnx(model_path) and os.path.exists(model_path)
         self.conf = conf
 
     def classify(self, frame: np.ndarray) -> Tuple[str, float]:
         """Return (vehicle_type, confidence) for the whole frame."""
-        results = self.model.predict(frame, conf=self.conf, verbose=False)
         best_class, best_conf = "car", 0.0
+        for *_, vehicle_type, conf in self.detect_vehicles(frame):
+            if conf > best_conf:
+                best_class, best_conf = vehicle_type, conf
+        return best_class, best_conf
+
+    def detect_vehicles(self, frame: np.ndarray) -> List[Tuple[int, int, int, int, str, float]]:
+        """Return every vehicle in the frame as (x1, y1, x2, y2, vehicle_type, confidence)."""
+        if self.onnx:
+            names = self.model.names
+            return [
+                (x1, y1, x2, y2, _map_vehicle_class(names.get(cls_id, "car").lower()), conf)
+                for x1, y1, x2, y2, conf, cls_id in self.model.predict([frame], self.conf)[0]
+            ]
+        results = self.model.predict(frame, conf=self.conf, verbose=False)
+        vehicles = []
         for r in results:
             for box in r.boxes:
                 cls_id = int(box.cls[0])
                 cls_name = r.names.get(cls_id, "car").lower()
-                conf = float(box.conf[0])
-                # Map COCO names to our categories
-                if any(v in cls_name for v in ["truck", "bus", "motorcycle", "van"]):
-                    mapped = next(v for v in VEHICLE_CLASSES if v in cls_name)
-                else:
-                    mapped = "car"
-                if conf > best_conf:
-                    best_class, best_conf = mapped, conf
-        return best_class, best_conf
+                x1, y1, x2, y2 = map(int, box.xyxy[0].tolist())
+                vehicles.append((x1, y1, x2, y2, _map_vehicle_class(cls_name), float(box.conf[0])))
+        return vehicles
+
+
+def _map_vehicle_class(cls_name: str) -> str:
+    """Map COCO names to our categories."""
+    if any(v in cls_name for v in ["truck", "bus", "motorcycle", "van"]):
+        return next(v for v in VEHICLE_CLASSES if v in cls_name)
+    return "car"
+
+
+def find_vehicle(
+    plate_box: Tuple[int, int, int, int],
+    vehicles: List[Tuple[int, int, int, int, str, float]],
+) -> Tuple[int, int, int, int, str, float] | None:
+    """Return the vehicle box containing the plate.
+
+    The plate centre must lie inside the vehicle box; when several boxes
+    qualify the smallest one wins (the nearest vehicle, not a bus behind it).
+    """
+    cx = (plate_box[0] + plate_box[2]) / 2
+    cy = (plate_box[1] + plate_box[3]) / 2
+    best, best_area = None, None
+    for vehicle in vehicles:
+        x1, y1, x2, y2 = vehicle[:4]
+        if not (x1 <= cx <= x2 and y1 <= cy <= y2):
+            continue
+        area = (x2 - x1) * (y2 - y1)
+        if best_area is None or area < best_area:
+            best, best_area = vehicle, area
+    return best
+
+
+def match_vehicle(
+    plate_box: Tuple[int, int, int, int],
+    vehicles: List[Tuple[int, int, int, int, str, float]],
+) -> Tuple[str, float] | None:
+    """Return (vehicle_type, confidence) of the vehicle box containing the plate (see ``find_vehicle``)."""
+    vehicle = find_vehicle(plate_box, vehicles)
+    return None if vehicle is None else (vehicle[4], vehicle[5])
@@ -1,41 +1,344 @@
-"""Event poster — Redis-debounced HTTP POST to the backend /api/vision/plate-event."""
+"""Event poster — debounced HTTP POST to the backend /api/vision/plate-event.
+
+Events are handed to a background sender thread through a bounded queue, so
+the frame loop never waits on the backend. The snapshot (full frame, vehicle
+or plate crop per SNAPSHOT_MODE) is JPEG-encoded on that thread too and
+uploaded as a binary multipart file. Failed sends are retried with
+exponential backoff and then spilled to an append-only on-disk spool, which
+is replayed in order once the backend is reachable again — in batches of
+POSTER_REPLAY_BATCH events through /api/vision/plate-event/batch. A spooled
+event the backend keeps failing on (HTTP 500) is moved to a dead-letter file
+after POSTER_MAX_ATTEMPTS tries, so it cannot block the events behind it.
+"""
 from __future__ import annotations
 import os
+import json
 import time
+import queue
 import base64
 import logging
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
 
 import redis
 import requests
 import numpy as np
 import cv2
 
+from vision import metrics
+
 BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 DEBOUNCE_SECONDS = int(os.getenv("DEBOUNCE_SECONDS", "10"))
+# "1" = debounce in-process only (no Redis); while Redis is unreachable this is automatic
+DEBOUNCE_LOCAL_ONLY = os.getenv("DEBOUNCE_LOCAL_ONLY", "0") == "1"
+# How long to stay local-only after a Redis error before trying it again
+DEBOUNCE_REDIS_RETRY = float(os.getenv("DEBOUNCE_REDIS_RETRY", "30"))
 BACKEND_API_KEY = os.getenv("VISION_API_KEY", "vision-internal-key")
 
+# Background sender
+POSTER_QUEUE_SIZE = int(os.getenv("POSTER_QUEUE_SIZE", "256"))
+# Events arriving while the send queue is full keep their snapshot up to this many; the sender spools them
+POSTER_OVERFLOW_SIZE = int(os.getenv("POSTER_OVERFLOW_SIZE", "1024"))
+POSTER_MAX_RETRIES = int(os.getenv("POSTER_MAX_RETRIES", "4"))
+POSTER_BACKOFF_BASE = float(os.getenv("POSTER_BACKOFF_BASE", "0.5"))   # seconds
+POSTER_BACKOFF_MAX = float(os.getenv("POSTER_BACKOFF_MAX", "30"))      # seconds
+POSTER_SPOOL_PATH = os.getenv("POSTER_SPOOL_PATH", "spool/plate_events.jsonl")
+POSTER_SPOOL_MAX_MB = int(os.getenv("POSTER_SPOOL_MAX_MB", "256"))
+POSTER_REPLAY_BATCH = int(os.getenv("POSTER_REPLAY_BATCH", "100"))   # spooled events per request (1 = one by one)
+POSTER_MAX_ATTEMPTS = int(os.getenv("POSTER_MAX_ATTEMPTS", "10"))     # server errors on a spooled event before dead-lettering
+POSTER_DEAD_LETTER_PATH = os.getenv("POSTER_DEAD_LETTER_PATH", "spool/plate_events.dead.jsonl")
+
+# Snapshot policy: "frame" | "vehicle" | "plate" | "none", longest side cap (0 = none), JPEG quality
+SNAPSHOT_MODE = os.getenv("SNAPSHOT_MODE", "vehicle")
+SNAPSHOT_MAX_DIM = int(os.getenv("SNAPSHOT_MAX_DIM", "640"))
+SNAPSHOT_JPEG_QUALITY = int(os.getenv("SNAPSHOT_JPEG_QUALITY", "80"))
+
 logger = logging.getLogger(__name__)
 
 
-class EventPoster:
-    """Post plate events to backend with Redis-based per-plate debounce."""
+class _PermanentError(Exception):
+    """The backend rejected the event (4xx) — retrying will not help."""
 
-    def __init__(self):
-        self._redis = redis.from_url(REDIS_URL, decode_responses=True)
-        self._session = requests.Session()
-        self._session.headers["X-Vision-Key"] = BACKEND_API_KEY
 
-    def should_post(self, plate_normalized: str) -> bool:
-        """Return True if enough time has passed since last post for this plate."""
-        key = f"debounce:{plate_normalized}"
-        if self._redis.get(key):
-            return False
-        return True
+class _ServerError(Exception):
+    """The backend answered with an internal error — possibly caused by the event itself."""
+
+
+# Gateway / availability errors mean the backend is down, not that the event is bad
+_UNAVAILABLE = {502, 503, 504}
+
+
+def _check_response(resp: requests.Response):
+    if 400 <= resp.status_code < 500:
+        raise _PermanentError(f"{resp.status_code}: {resp.text[:200]}")
+    if resp.status_code >= 500 and resp.status_code not in _UNAVAILABLE:
+        raise _ServerError(f"{resp.status_code}: {resp.text[:200]}")
+    resp.raise_for_status()
+
+
+Box = Tuple[int, int, int, int]
+
+
+def select_snapshot(
+    frame: np.ndarray | None,
+    mode: str = SNAPSHOT_MODE,
+    plate_box: Box | None = None,
+    vehicle_box: Box | None = None,
+) -> np.ndarray | None:
+    """Cut the snapshot region for ``mode`` out of the frame.
+
+    Always returns a copy — frames are views into the capture ring buffer.
+    Without a detected vehicle box the vehicle region is estimated from the
+    plate; without any box the whole frame is used.
+    """
+    if frame is None or mode == "none":
+        return None
+    box = None
+    if mode == "plate" and plate_box is not None:
+        box = _expand(plate_box, 0.15, 0.15, 0.15, 0.15)
+    elif mode == "vehicle":
+        if vehicle_box is not None:
+            box = vehicle_box
+        elif plate_box is not None:
+            # Rear/front of a car is roughly 5 plate widths across, plate near the bottom
+            box = _expand(plate_box, 2.0, 2.0, 3.0, 0.8)
+    if box is None:
+        return frame.copy()
+    h, w = frame.shape[:2]
+    x1, y1 = max(0, int(box[0])), max(0, int(box[1]))
+    x2, y2 = min(w, int(box[2])), min(h, int(box[3]))
+    if x2 <= x1 or y2 <= y1:
+        return frame.copy()
+    return frame[y1:y2, x1:x2].copy()
+
+
+def _expand(box: Box, left: float, right: float, up: float, down: float) -> Box:
+    """Grow a box on each side by a multiple of its width."""
+    x1, y1, x2, y2 = box
+    bw = x2 - x1
+    return int(x1 - left * bw), int(y1 - up * bw), int(x2 + right * bw), int(y2 + down * bw)
+
+
+def encode_snapshot(image: np.ndarray, max_dim: int = SNAPSHOT_MAX_DIM, quality: int = SNAPSHOT_JPEG_QUALITY) -> bytes:
+    """Downscale so the longest side is at most ``max_dim`` and JPEG-encode."""
+    h, w = image.shape[:2]
+    if max_dim and max(h, w) > max_dim:
+        scale = max_dim / max(h, w)
+        image = cv2.resize(image, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+    ok, buf = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError("JPEG encoding failed")
+    return buf.tobytes()
+
+
+class EventSpool:
+    """Append-only JSON-lines spool of events waiting for the backend.
+
+    A sidecar ``.offset`` file records how far replay has got, so a restart
+    resumes where it left off. Once everything is replayed the file is
+    truncated. An event that cannot be delivered is moved to the dead-letter
+    file (one JSON line with the reason) so replay can go on.
+    """
+
+    def __init__(
+        self,
+        path: str = POSTER_SPOOL_PATH,
+        max_bytes: int = POSTER_SPOOL_MAX_MB * 1024 * 1024,
+        dead_letter_path: str = POSTER_DEAD_LETTER_PATH,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.dead_letter_path = dead_letter_path
+        self._offset_path = path + ".offset"
+        self._lock = threading.Lock()
+        self.dropped = 0
+        self.dead_lettered = 0
+        # Failed delivery attempts of the event at the head (reset when it advances)
+        self.head_failures = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._offset = self._read_offset()
+        self.records = self._count_pending()
+
+    def append(self, payload: dict) -> bool:
+        line = (json.dumps(payload, separators=(",", ":")) + "\n").encode()
+        with self._lock:
+            if self.size_bytes + len(line) > self.max_bytes:
+                self.dropped += 1
+                logger.error("Event spool full (%d bytes) — dropping event", self.size_bytes)
+                return False
+            with open(self.path, "ab") as f:
+                f.write(line)
+            self.records += 1
+            return True
+
+    def peek(self) -> dict | None:
+        """Return the oldest un-replayed event, or None if the spool is drained."""
+        events = self.peek_many(1)
+        return events[0] if events else None
+
+    def peek_many(self, limit: int) -> List[dict]:
+        """Return up to ``limit`` of the oldest un-replayed events, oldest first."""
+        events = []
+        with self._lock:
+            if not os.path.exists(self.path):
+                return events
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                while len(events) < limit:
+                    line = f.readline()
+                    if not line.strip():
+                        break
+                    events.append(json.loads(line))
+        return events
+
+    def advance(self, count: int = 1):
+        """Mark the ``count`` events returned by ``peek()``/``peek_many()`` as delivered."""
+        with self._lock:
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                for _ in range(count):
+                    f.readline()
+                self._offset = f.tell()
+            self.records = max(0, self.records - count)
+            self.head_failures = 0
+            if self._offset >= os.path.getsize(self.path):
+                # Fully replayed — compact
+                open(self.path, "wb").close()
+                self._offset = 0
+            self._write_offset()
+
+    def dead_letter(self, reason: str):
+        """Move the event at the head to the dead-letter file and advance past it."""
+        event = self.peek()
+        if event is None:
+            return
+        record = {"failed_at": datetime.now(timezone.utc).isoformat(), "reason": reason, "event": event}
+        with self._lock:
+            os.makedirs(os.path.dirname(self.dead_letter_path) or ".", exist_ok=True)
+            with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            self.dead_lettered += 1
+        self.advance()
+
+    def pending(self) -> bool:
+        return self.records > 0
+
+    @property
+    def size_bytes(self) -> int:
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def _read_offset(self) -> int:
+        try:
+            with open(self._offset_path) as f:
+                return min(int(f.read().strip() or 0), self.size_bytes)
+        except (OSError, ValueError):
+            return 0
+
+    def _write_offset(self):
+        tmp = self._offset_path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(str(self._offset))
+        os.replace(tmp, self._offset_path)
+
+    def _count_pending(self) -> int:
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            return sum(1 for line in f if line.strip())
+
+
+class Debouncer:
+    """Per-plate debounce: an in-process TTL cache in front of an atomic Redis claim.
+
+    ``claim()`` returns True for the first sighting of a plate in the
+    debounce window, across every gate and process sharing the Redis. Plates
+    already seen (or claimed elsewhere) are remembered locally until their
+    window ends, so repeated sightings never reach Redis. Without Redis —
+    disabled, or down — the local cache alone decides, per process.
+    """
+
+    def __init__(self, redis_client=None, ttl: int = DEBOUNCE_SECONDS, retry_after: float = DEBOUNCE_REDIS_RETRY):
+        self._redis = redis_client
+        self.ttl = ttl
+        self.retry_after = retry_after
+        # plate → monotonic time its debounce window ends
+        self._until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._redis_down_until = 0.0
+        self.local_hits = 0
+        self.redis_claims = 0
+        self.redis_errors = 0
 
-    def mark_posted(self, plate_normalized: str):
+    def claim(self, plate_normalized: str) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if self._until.get(plate_normalized, 0.0) > now:
+                self.local_hits += 1
+                return False
+            if len(self._until) > 1024:
+                self._until = {p: t for p, t in self._until.items() if t > now}
+
+        claimed, remaining = self._claim_redis(plate_normalized, now)
+        with self._lock:
+            self._until[plate_normalized] = now + remaining
+        return claimed
+
+    def _claim_redis(self, plate_normalized: str, now: float) -> Tuple[bool, float]:
+        """Return (claimed, seconds left in the window); local-only when Redis is unavailable."""
+        if self._redis is None or now < self._redis_down_until:
+            return True, self.ttl
         key = f"debounce:{plate_normalized}"
-        self._redis.setex(key, DEBOUNCE_SECONDS, "1")
+        try:
+            # One round trip: atomic claim, plus the TTL of a claim made elsewhere
+            pipe = self._redis.pipeline(transaction=False)
+            pipe.set(key, "1", nx=True, ex=self.ttl)
+            pipe.pttl(key)
+            claimed, pttl = pipe.execute()
+        except redis.RedisError as e:
+            self.redis_errors += 1
+            if self._redis_down_until == 0.0 or now >= self._redis_down_until:
+                logger.warning("Redis unavailable for debounce (%s) — debouncing locally for %.0fs", e, self.retry_after)
+            self._redis_down_until = now + self.retry_after
+            return True, self.ttl
+        self._redis_down_until = 0.0
+        self.redis_claims += 1
+        if claimed:
+            return True, self.ttl
+        return False, pttl / 1000 if pttl and pttl > 0 else self.ttl
+
+
+class EventPoster:
+    """Post plate events to backend with a per-plate debounce (see ``Debouncer``)."""
+
+    def __init__(self, spool: EventSpool | None = None, debouncer: Debouncer | None = None):
+        if debouncer is None:
+            client = None if DEBOUNCE_LOCAL_ONLY else redis.from_url(
+                REDIS_URL, decode_responses=True, socket_timeout=0.5, socket_connect_timeout=0.5
+            )
+            debouncer = Debouncer(client)
+        self._debouncer = debouncer
+        self._session = requests.Session()
+        self._session.headers["X-Vision-Key"] = BACKEND_API_KEY
+        self._queue: queue.Queue = queue.Queue(maxsize=POSTER_QUEUE_SIZE)
+        self._overflow: deque = deque()
+        self._spool = spool or EventSpool()
+        self._stop = threading.Event()
+        # The live event the sender is posting, so close() can spool it if the sender is stuck
+        self._in_flight: dict | None = None
+        self._in_flight_lock = threading.Lock()
+        self._backoff = POSTER_BACKOFF_BASE
+        self.sent = 0
+        self.failed = 0
+        self.rejected = 0
+        self.spooled = 0
+        metrics.POSTER_QUEUE_DEPTH.set_function(self._queue.qsize)
+        metrics.SPOOL_RECORDS.set_function(lambda: self._spool.records)
+        self._thread = threading.Thread(target=self._send_loop, name="event-poster", daemon=True)
+        self._thread.start()
 
     def post_event(
         self,
@@ -45,33 +348,278 @@ class EventPoster:
         ocr_confidence: float,
         vehicle_type: str,
         snapshot: np.ndarray | None = None,
-    ) -> dict | None:
-        if not self.should_post(plate_normalized):
+        plate_box: Box | None = None,
+        vehicle_box: Box | None = None,
+        captured_at: float | None = None,
+    ) -> bool:
+        """Queue an event for the background sender; return True if it was accepted.
+
+        ``snapshot`` is the full frame; the boxes let SNAPSHOT_MODE crop it.
+        ``captured_at`` (epoch seconds) is when the reading was taken; it defaults
+        to now and is always sent, so retried and spooled events keep their
+        real time (the backend bills sessions from it).
+        """
+        if not self._debouncer.claim(plate_normalized):
             logger.debug("Debounced plate: %s", plate_normalized)
-            return None
+            metrics.EVENTS_DEBOUNCED.labels(gate_id).inc()
+            return False
 
+        # Field names follow the backend's PlateEventIn
         payload = {
-            "plate": plate,
-            "plate_normalized": plate_normalized,
+            "plate": plate_normalized,
+            "raw_plate": plate,
             "gate_id": gate_id,
-            "ocr_confidence": ocr_confidence,
+            "confidence": ocr_confidence,
             "vehicle_type": vehicle_type,
+            "captured_at": datetime.fromtimestamp(
+                time.time() if captured_at is None else captured_at, timezone.utc
+            ).isoformat(),
         }
+        # Only the crop is copied here; encoding happens on the sender thread
+        image = select_snapshot(snapshot, SNAPSHOT_MODE, plate_box, vehicle_box)
+        if image is not None:
+            payload["_snapshot"] = image
+
+        # Behind an overflow, new events queue up there too to keep arrival order
+        if not self._overflow:
+            try:
+                self._queue.put_nowait(payload)
+                return True
+            except queue.Full:
+                pass
+        if len(self._overflow) < POSTER_OVERFLOW_SIZE:
+            logger.warning("Send queue full — event for %s handed to the spool", plate_normalized)
+        else:
+            # Bound the frames held in memory; never encode on the frame thread
+            logger.warning("Send queue and overflow full — event for %s spooled without snapshot", plate_normalized)
+            payload.pop("_snapshot", None)
+        self._overflow.append(payload)
+        return True
+
+    def send_event(self, payload: dict) -> dict:
+        """Synchronously POST one event; raise on failure.
+
+        Events with a snapshot go to the multipart upload endpoint.
+        """
+        jpeg = self._snapshot_bytes(payload)
+        event = {k: v for k, v in payload.items() if not k.startswith("_")}
+        with metrics.stage(payload.get("gate_id", ""), "post"):
+            if jpeg is None:
+                resp = self._session.post(f"{BACKEND_URL}/api/vision/plate-event", json=event, timeout=5)
+            else:
+                resp = self._session.post(
+                    f"{BACKEND_URL}/api/vision/plate-event/upload",
+                    data={"event": json.dumps(event)},
+                    files={"snapshot": ("snapshot.jpg", jpeg, "image/jpeg")},
+                    timeout=5,
+                )
+        _check_response(resp)
+        result = resp.json()
+        logger.info("Posted event for %s → %s", payload.get("plate"), result.get("decision"))
+        return result
+
+    def send_batch(self, payloads: List[dict]) -> List[dict]:
+        """Synchronously POST events in one request (applied in order); raise on failure.
+
+        Snapshots travel as base64 in the JSON body.
+        """
+        events = []
+        for payload in payloads:
+            jpeg = self._snapshot_bytes(payload)
+            event = {k: v for k, v in payload.items() if not k.startswith("_")}
+            if jpeg is not None:
+                event["image_base64"] = base64.b64encode(jpeg).decode()
+            events.append(event)
+        with metrics.stage(payloads[0].get("gate_id", ""), "post"):
+            resp = self._session.post(f"{BACKEND_URL}/api/vision/plate-event/batch", json={"events": events}, timeout=30)
+        _check_response(resp)
+        results = resp.json()["results"]
+        logger.info("Posted %d spooled events in one batch", len(results))
+        return results
+
+    def _snapshot_bytes(self, payload: dict) -> bytes | None:
+        """Encode a pending snapshot once (kept for retries) and return the JPEG bytes."""
+        image = payload.pop("_snapshot", None)
+        if image is not None:
+            with metrics.stage(payload.get("gate_id", ""), "encode"):
+                payload["_jpeg"] = encode_snapshot(image)
+        if "_jpeg" in payload:
+            return payload["_jpeg"]
+        if "_jpeg_b64" in payload:
+            return base64.b64decode(payload["_jpeg_b64"])
+        return None
+
+    # ── Background sender ──────────────────────────────────────────────────
+    def _send_loop(self):
+        while not self._stop.is_set():
+            self._spill_overflow()
+            try:
+                payload = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                payload = None
+
+            # Keep arrival order: while a backlog exists, new events go behind it
+            if self._spool.pending():
+                if payload is not None:
+                    self._spill(payload)
+                if not self._replay_spool():
+                    self._stop.wait(self._next_backoff())
+                continue
 
-        if snapshot is not None:
-            _, buf = cv2.imencode(".jpg", snapshot, [cv2.IMWRITE_JPEG_QUALITY, 85])
-            payload["image_b64"] = base64.b64encode(buf).decode()
+            if payload is not None:
+                self._in_flight = payload
+                delivered = self._send_with_retry(payload)
+                # close() may have spooled it already while the request hung
+                if self._take_in_flight() is not None and not delivered:
+                    self._spill(payload)
 
+    def _take_in_flight(self) -> dict | None:
+        with self._in_flight_lock:
+            payload, self._in_flight = self._in_flight, None
+        return payload
+
+    def _send_with_retry(self, payload: dict) -> bool:
+        for attempt in range(POSTER_MAX_RETRIES + 1):
+            if self._try_send(payload):
+                return True
+            if attempt < POSTER_MAX_RETRIES and self._stop.wait(self._next_backoff()):
+                break
+        return False
+
+    def _replay_spool(self) -> bool:
+        """Send spooled events oldest-first; return False if the backend is still down."""
+        while not self._stop.is_set():
+            payloads = self._spool.peek_many(max(1, POSTER_REPLAY_BATCH))
+            if not payloads:
+                return True
+            if len(payloads) > 1:
+                delivered = self._try_send_batch(payloads)
+                if delivered is False:
+                    return False
+                if delivered:
+                    self._spool.advance(len(payloads))
+                    continue
+            # Rejected or failed batch: one by one, so only the offending event is dropped
+            for payload in payloads:
+                try:
+                    delivered = self._try_send(payload, raise_server_errors=True)
+                except _ServerError as e:
+                    self._spool.head_failures += 1
+                    if self._spool.head_failures < POSTER_MAX_ATTEMPTS:
+                        return False
+                    logger.error("Backend failed %d times on event for %s — moved to %s",
+                                 self._spool.head_failures, payload.get("plate"), self._spool.dead_letter_path)
+                    metrics.EVENTS_DEAD_LETTERED.labels(payload.get("gate_id", "")).inc()
+                    self._spool.dead_letter(str(e))
+                    continue
+                if not delivered:
+                    return False
+                self._spool.advance()
+        return False
+
+    def _try_send_batch(self, payloads: List[dict]) -> bool | None:
+        """True when delivered, False if the backend is down, None if it rejected or failed on the batch."""
+        gate_id = payloads[0].get("gate_id", "")
         try:
-            resp = self._session.post(
-                f"{BACKEND_URL}/api/vision/plate-event",
-                json=payload,
-                timeout=5,
-            )
-            resp.raise_for_status()
-            self.mark_posted(plate_normalized)
-            logger.info("Posted event for %s → %s", plate_normalized, resp.json().get("decision"))
-            return resp.json()
-        except Exception as e:
-            logger.error("Failed to post event for %s: %s", plate_normalized, e)
+            self.send_batch(payloads)
+        except (_PermanentError, _ServerError) as e:
+            logger.warning("Backend refused a batch of %d events (%s) — replaying them one by one", len(payloads), e)
             return None
+        except Exception as e:
+            self.failed += 1
+            metrics.POST_FAILURES.labels(gate_id).inc()
+            logger.error("Failed to post a batch of %d events: %s", len(payloads), e)
+            return False
+        self.sent += len(payloads)
+        for payload in payloads:
+            metrics.EVENTS_POSTED.labels(payload.get("gate_id", "")).inc()
+        self._backoff = POSTER_BACKOFF_BASE
+        return True
+
+    def _try_send(self, payload: dict, raise_server_errors: bool = False) -> bool:
+        """Return True when the event is done with (delivered or permanently rejected).
+
+        With ``raise_server_errors`` a 500 from the backend is counted and re-raised,
+        so spool replay can tell a failing event from an unreachable backend.
+        """
+        try:
+            self.send_event(payload)
+            self.sent += 1
+            metrics.EVENTS_POSTED.labels(payload.get("gate_id", "")).inc()
+            self._backoff = POSTER_BACKOFF_BASE
+            return True
+        except _PermanentError as e:
+            self.rejected += 1
+            metrics.EVENTS_REJECTED.labels(payload.get("gate_id", "")).inc()
+            logger.error("Backend rejected event for %s: %s", payload.get("plate"), e)
+            return True
+        except Exception as e:
+            self.failed += 1
+            metrics.POST_FAILURES.labels(payload.get("gate_id", "")).inc()
+            logger.error("Failed to post event for %s: %s", payload.get("plate"), e)
+            if raise_server_errors and isinstance(e, _ServerError):
+                raise
+            return False
+
+    def _next_backoff(self) -> float:
+        delay = self._backoff
+        self._backoff = min(self._backoff * 2, POSTER_BACKOFF_MAX)
+        return delay
+
+    def _spill_overflow(self):
+        """Spool events that found the send queue full, encoding their snapshots here."""
+        if self._overflow:
+            self._spill_queued()
+
+    def _spill_queued(self):
+        # Queued events are older than the overflow — spool them first to keep order
+        while True:
+            try:
+                self._spill(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        while self._overflow:
+            self._spill(self._overflow.popleft())
+
+    def _spill(self, payload: dict):
+        # The spool is JSON lines — carry the snapshot as base64 JPEG there
+        jpeg = self._snapshot_bytes(payload)
+        payload = {k: v for k, v in payload.items() if not k.startswith("_")}
+        if jpeg is not None:
+            payload["_jpeg_b64"] = base64.b64encode(jpeg).decode()
+        if self._spool.append(payload):
+            self.spooled += 1
+            metrics.EVENTS_SPOOLED.labels(payload.get("gate_id", "")).inc()
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "overflow_depth": len(self._overflow),
+            "spool_records": self._spool.records,
+            "spool_bytes": self._spool.size_bytes,
+            "spool_dropped": self._spool.dropped,
+            "dead_lettered": self._spool.dead_lettered,
+            "sent": self.sent,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "spooled": self.spooled,
+            "debounce_local_hits": self._debouncer.local_hits,
+            "debounce_redis_claims": self._debouncer.redis_claims,
+            "debounce_redis_errors": self._debouncer.redis_errors,
+        }
+
+    def close(self, timeout: float = 5.0):
+        """Stop the sender; anything still queued or in flight is spooled for the next run.
+
+        A sender still blocked in a request after ``timeout`` gives up its event
+        to the spool (spooled events stay there until replay advances past them).
+        """
+        self._stop.set()
+        self._thread.join(timeout=timeout)
+        if self._thread.is_alive():
+            payload = self._take_in_flight()
+            if payload is not None:
+                logger.warning("Sender still posting event for %s at shutdown — spooling it", payload.get("plate"))
+                self._spill(payload)
+        self._spill_queued()
@@ -3,103 +3,183 @@ from __future__ import annotations
 import os
 import logging
 import time
-import numpy as np
+from typing import Dict, List
 
+from vision import metrics
 from vision.camera.stream_handler import StreamHandler
+from vision.camera.multi_stream import MultiStreamHandler
+from vision.camera.motion_gate import offset_boxes
 from vision.detector.yolo_detector import PlateDetector, VehicleClassifier
-from vision.ocr.ocr_engine import read_plate
-from vision.ocr.postprocessor import post_process
-from vision.tracker.deepsort_tracker import PlateTracker
 from vision.event_poster import EventPoster
+from vision.ocr.ocr_pool import OCRPool
+from vision.pipeline import GatePipeline, make_motion_gate, make_tracker
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
 logger = logging.getLogger("vision.main")
 
 GATE_ID = os.getenv("GATE_ID", "gate_01")
 STREAM_SOURCE = os.getenv("STREAM_SOURCE", "0")  # "0" = default webcam, or RTSP URL
-OCR_CONFIDENCE_THRESHOLD = float(os.getenv("OCR_CONFIDENCE_THRESHOLD", "0.6"))
+# Multi-stream mode: "gate_01=0,gate_02=rtsp://host/stream" — overrides GATE_ID/STREAM_SOURCE
+STREAM_SOURCES = os.getenv("STREAM_SOURCES", "")
+# OCR worker processes (0 = run OCR inline in the frame loop) and their bounded queue size
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", "0"))
+OCR_QUEUE_SIZE = int(os.getenv("OCR_QUEUE_SIZE", "8"))
+
+
+def parse_source(value: str) -> str | int:
+    """Parse stream source (int for webcam index, str for RTSP URL / file)."""
+    return int(value) if value.isdigit() else value
+
+
+def parse_stream_sources(value: str) -> Dict[str, str | int]:
+    """Parse a "gate=source,gate=source" list into {gate_id: source}."""
+    sources = {}
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        gate_id, _, source = item.partition("=")
+        if not source:
+            raise ValueError(f"Invalid STREAM_SOURCES entry (expected gate=source): {item}")
+        sources[gate_id.strip()] = parse_source(source.strip())
+    return sources
+
+
+def make_ocr_pool(workers: int = OCR_WORKERS, queue_size: int = OCR_QUEUE_SIZE) -> OCRPool | None:
+    if workers <= 0:
+        return None
+    logger.info("OCR worker pool: %d processes, queue size %d", workers, queue_size)
+    return OCRPool(workers=workers, max_pending=queue_size)
+
+
+def make_gates(
+    gate_ids: List[str],
+    classifier: VehicleClassifier,
+    poster: EventPoster,
+    ocr_pool: OCRPool | None = None,
+    lane_rois: Dict[str, str] | None = None,
+) -> Dict[str, GatePipeline]:
+    """Build one GatePipeline per gate; their trackers share a single DeepSORT embedder."""
+    gates: Dict[str, GatePipeline] = {}
+    embedder = None
+    for gate_id in gate_ids:
+        tracker = make_tracker(embedder)
+        embedder = tracker.embedder
+        roi = (lane_rois or {}).get(gate_id)
+        gates[gate_id] = GatePipeline(
+            gate_id, classifier, poster, tracker=tracker, ocr_pool=ocr_pool,
+            motion_gate=make_motion_gate(gate_id, roi),
+        )
+    return gates
 
 
 def run_pipeline():
     logger.info("Starting TunisPark Vision Pipeline — Gate: %s", GATE_ID)
 
-    # Parse stream source (int for webcam index, str for RTSP URL)
-    source = int(STREAM_SOURCE) if STREAM_SOURCE.isdigit() else STREAM_SOURCE
+    source = parse_source(STREAM_SOURCE)
 
     stream = StreamHandler(source, fps_limit=10)
     detector = PlateDetector()
-    classifier = VehicleClassifier()
-    tracker = PlateTracker()
+    ocr_pool = make_ocr_pool()
     poster = EventPoster()
+    gate = GatePipeline(GATE_ID, VehicleClassifier(), poster, ocr_pool=ocr_pool)
 
     stream.start()
+    metrics.start_server()
     logger.info("Stream opened: %s", STREAM_SOURCE)
 
+    last_seq = 0
     try:
         while True:
-            frame = stream.read()
+            frame = stream.read_new(last_seq, timeout=0.5)
             if frame is None:
-                time.sleep(0.05)
                 continue
+            metrics.record_frame(GATE_ID, frame.seq, last_seq, frame.timestamp)
+            last_seq = frame.seq
 
-            # 1. Detect plates
-            plate_boxes = detector.detect(frame)
-            if not plate_boxes:
+            region = gate.detection_region(frame.image)
+            if region is None:
+                # Idle lane — no detection, but keep OCR results flowing
+                gate.process(frame.image, [])
                 continue
-
-            # 2. Format for tracker
-            tracker_inputs = [
-                tracker.format_detection(x1, y1, x2, y2, conf)
-                for (x1, y1, x2, y2, conf) in plate_boxes
-            ]
-            tracks = tracker.update(tracker_inputs, frame)
-
-            for track in tracks:
-                if not track.is_confirmed():
-                    continue
-                track_id = track.track_id
-                ltrb = track.to_ltrb()
-                x1, y1, x2, y2 = map(int, ltrb)
-                # Clamp to frame
-                x1, y1 = max(0, x1), max(0, y1)
-                x2, y2 = min(frame.shape[1], x2), min(frame.shape[0], y2)
-                crop = frame[y1:y2, x1:x2]
-                if crop.size == 0:
-                    continue
-
-                # 3. Run OCR on crop
-                raw_text, ocr_conf = read_plate(crop)
-                result = post_process(raw_text, ocr_conf)
-
-                if not result["valid"] or result["confidence"] < OCR_CONFIDENCE_THRESHOLD:
-                    continue
-
-                # 4. Update plate cache with best reading
-                tracker.cache_plate(track_id, result["normalized"], result["confidence"])
-                cached = tracker.get_plate(track_id)
-                if cached is None:
-                    continue
-
-                plate_normalized, best_conf = cached
-
-                # 5. Classify vehicle type from whole frame
-                vehicle_type, _ = classifier.classify(frame)
-
-                # 6. Post event (debounced)
-                poster.post_event(
-                    plate=result["plate"],
-                    plate_normalized=plate_normalized,
-                    gate_id=GATE_ID,
-                    ocr_confidence=best_conf,
-                    vehicle_type=vehicle_type,
-                    snapshot=frame,
-                )
+            if not gate.should_detect(frame.image):
+                # Between detections — tracks move by prediction, OCR reads the predicted boxes
+                gate.process_predicted(frame.image)
+                continue
+            image, offset = region
+            with metrics.stage(GATE_ID, "detect"):
+                plate_boxes = detector.detect(image)
+            gate.process(frame.image, offset_boxes(plate_boxes, offset))
 
     except KeyboardInterrupt:
         logger.info("Shutting down vision pipeline...")
     finally:
         stream.stop()
+        gate.flush_passages()
+        poster.close()
+        if ocr_pool is not None:
+            ocr_pool.shutdown()
+
+
+def run_multi_stream(sources: Dict[str, str | int]):
+    """Run several gates in one process with one batched detector pass per iteration."""
+    logger.info("Starting TunisPark Vision Pipeline — Gates: %s", ", ".join(sources))
+
+    streams = MultiStreamHandler(sources, fps_limit=10)
+    detector = PlateDetector()
+    classifier = VehicleClassifier()
+    poster = EventPoster()
+    ocr_pool = make_ocr_pool()
+    gates = make_gates(list(sources), classifier, poster, ocr_pool)
+
+    streams.start()
+    metrics.start_server()
+
+    try:
+        serve_gates(streams, detector, gates)
+    except KeyboardInterrupt:
+        logger.info("Shutting down vision pipeline...")
+    finally:
+        streams.stop()
+        for gate in gates.values():
+            gate.flush_passages()
+        poster.close()
+        if ocr_pool is not None:
+            ocr_pool.shutdown()
+
+
+def serve_gates(streams: MultiStreamHandler, detector: PlateDetector, gates: Dict[str, GatePipeline]):
+    """Frame loop shared by multi-stream mode and the supervisor — runs until interrupted."""
+    last_seq = {gate_id: 0 for gate_id in gates}
+    while True:
+        frames = streams.read_latest()
+        if not frames:
+            time.sleep(0.01)
+            continue
+
+        regions = {}
+        for gate_id, frame in frames.items():
+            metrics.record_frame(gate_id, frame.seq, last_seq[gate_id], frame.timestamp)
+            last_seq[gate_id] = frame.seq
+            region = gates[gate_id].detection_region(frame.image)
+            if region is None:
+                gates[gate_id].process(frame.image, [])
+            elif not gates[gate_id].should_detect(frame.image):
+                gates[gate_id].process_predicted(frame.image)
+            else:
+                regions[gate_id] = region
+
+        if regions:
+            t0 = time.perf_counter()
+            detections = detector.detect_streams({g: image for g, (image, _) in regions.items()})
+            elapsed = time.perf_counter() - t0
+            for gate_id, plate_boxes in detections.items():
+                metrics.observe_stage(gate_id, "detect", elapsed)
+                gates[gate_id].process(frames[gate_id].image, offset_boxes(plate_boxes, regions[gate_id][1]))
 
 
 if __name__ == "__main__":
-    run_pipeline()
+    if STREAM_SOURCES:
+        run_multi_stream(parse_stream_sources(STREAM_SOURCES))
+    else:
+        run_pipeline()
@@ -0,0 +1,77 @@
+"""Prometheus metrics for the vision process — per-stage latency and counters, labelled by gate.
+
+Scrape ``http://<host>:METRICS_PORT/metrics``. Stages of ``vision_stage_seconds``:
+
+- ``capture``     frame age when the loop picks it up (decode + wait in the ring)
+- ``detect``      YOLO plate detection (a batched pass is charged to every gate in it)
+- ``track``       tracker update (including the appearance embedder) or prediction
+- ``preprocess``  plate preprocessing before OCR
+- ``ocr``         EasyOCR recognition
+- ``vehicle``     vehicle detection for vehicle-type matching
+- ``enqueue``     building and queueing an event (snapshot crop)
+- ``encode``      snapshot JPEG encoding on the sender thread
+- ``post``        HTTP POST to the backend, per attempt
+"""
+from __future__ import annotations
+import os
+import time
+import logging
+
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+
+logger = logging.getLogger(__name__)
+
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))  # 0 disables the endpoint
+
+_STAGE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+STAGE_SECONDS = Histogram(
+    "vision_stage_seconds", "Time spent per pipeline stage", ["gate", "stage"], buckets=_STAGE_BUCKETS
+)
+
+FRAMES_CAPTURED = Counter("vision_frames_captured", "Frames decoded by the capture thread", ["gate"])
+FRAMES_DROPPED = Counter("vision_frames_dropped", "Captured frames overwritten before the loop read them", ["gate"])
+FRAMES_PROCESSED = Counter("vision_frames_processed", "Frames run through the gate pipeline", ["gate"])
+FRAMES_IDLE = Counter("vision_frames_idle", "Frames skipped by the lane motion gate", ["gate"])
+FRAMES_PREDICTED = Counter("vision_frames_predicted", "Frames tracked by motion prediction without detection", ["gate"])
+DETECTIONS = Counter("vision_detections", "Plate boxes returned by the detector", ["gate"])
+OCR_CALLS = Counter("vision_ocr_calls", "Plate crops sent to OCR", ["gate"])
+OCR_SKIPPED = Counter("vision_ocr_skipped", "OCR calls skipped for locked tracks", ["gate"])
+OCR_DROPPED = Counter("vision_ocr_dropped", "Queued OCR jobs dropped for newer ones", ["gate"])
+EVENTS_DEBOUNCED = Counter("vision_events_debounced", "Events suppressed by the debounce window", ["gate"])
+EVENTS_POSTED = Counter("vision_events_posted", "Events delivered to the backend", ["gate"])
+EVENTS_REJECTED = Counter("vision_events_rejected", "Events permanently rejected by the backend (4xx)", ["gate"])
+EVENTS_SPOOLED = Counter("vision_events_spooled", "Events written to the disk spool", ["gate"])
+EVENTS_DEAD_LETTERED = Counter("vision_events_dead_lettered", "Spooled events moved to the dead-letter file after repeated backend errors", ["gate"])
+POST_FAILURES = Counter("vision_post_failures", "Failed POST attempts (network / 5xx)", ["gate"])
+POSTER_QUEUE_DEPTH = Gauge("vision_poster_queue_depth", "Events waiting in the in-memory send queue")
+SPOOL_RECORDS = Gauge("vision_spool_records", "Events waiting in the disk spool")
+
+
+def start_server(port: int = METRICS_PORT):
+    """Serve /metrics from a daemon thread (no-op when ``port`` is 0)."""
+    if port <= 0:
+        return
+    start_http_server(port)
+    logger.info("Metrics endpoint on :%d/metrics", port)
+
+
+def stage(gate_id: str, name: str):
+    """Context manager timing one stage: ``with stage(gate_id, "detect"): ...``."""
+    return STAGE_SECONDS.labels(gate_id, name).time()
+
+
+def observe_stage(gate_id: str, name: str, seconds: float):
+    STAGE_SECONDS.labels(gate_id, name).observe(seconds)
+
+
+def record_frame(gate_id: str, seq: int, last_seq: int, captured_at: float):
+    """Account for a frame picked up by the loop; sequence gaps are dropped frames."""
+    if last_seq:
+        captured = seq - last_seq
+        FRAMES_CAPTURED.labels(gate_id).inc(captured)
+        if captured > 1:
+            FRAMES_DROPPED.labels(gate_id).inc(captured - 1)
+    else:
+        FRAMES_CAPTURED.labels(gate_id).inc()
+    observe_stage(gate_id, "capture", max(0.0, time.time() - captured_at))
@@ -1,10 +1,21 @@
 """EasyOCR engine wrapper for bilingual (Arabic + Latin) Tunisian plates."""
 from __future__ import annotations
-from typing import Tuple
+import os
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
 import numpy as np
 import easyocr
 
-from vision.ocr.preprocessor import preprocess_plate
+from vision.ocr.preprocessor import preprocess_plate, preprocess_plate_with_angle, segment_plate
+
+# Preprocessing tier: "auto" tries the fast tier first and escalates to the
+# full tier when confidence is below OCR_ESCALATE_BELOW; or fixed fast / balanced / full
+OCR_TIER = os.getenv("OCR_TIER", "auto")
+OCR_ESCALATE_BELOW = float(os.getenv("OCR_ESCALATE_BELOW", "0.6"))
+# "detect": EasyOCR readtext (CRAFT text detection + recognition);
+# "recognize": recognizer only, on text boxes cut by projection (see segment_plate) —
+# skips the CRAFT detector; on GPU the crops of a batch share one recognize() call
+OCR_MODE = os.getenv("OCR_MODE", "detect")
 
 # Singleton reader — instantiation is expensive
 _reader: easyocr.Reader | None = None
@@ -18,12 +29,123 @@ def _get_reader() -> easyocr.Reader:
     return _reader
 
 
-def read_plate(crop: np.ndarray) -> Tuple[str, float]:
+def read_plate(crop: np.ndarray, tier: str = "full", skew_angle: Optional[float] = None) -> Tuple[str, float]:
     """Run OCR on a cropped plate image.
 
     Returns (raw_text, confidence) where confidence is 0-1.
     """
-    processed = preprocess_plate(crop)
+    return _recognize(preprocess_plate(crop, tier, skew_angle))
+
+
+def read_plate_tiered(
+    crop: np.ndarray,
+    skew_angle: Optional[float] = None,
+    tier: str = OCR_TIER,
+    timings: Optional[Dict[str, float]] = None,
+) -> Tuple[str, float, Optional[float]]:
+    """Run OCR with tier escalation.
+
+    Returns (raw_text, confidence, skew_angle); the angle is None until a
+    tier has estimated it, and should be cached per track and passed back in.
+    When given, ``timings`` accumulates seconds spent in "preprocess" and "ocr".
+    """
+    return read_plates_tiered([crop], [skew_angle], tier, timings)[0]
+
+
+def read_plates_tiered(
+    crops: Sequence[np.ndarray],
+    skew_angles: Optional[Sequence[Optional[float]]] = None,
+    tier: str = OCR_TIER,
+    timings: Optional[Dict[str, float]] = None,
+) -> List[Tuple[str, float, Optional[float]]]:
+    """``read_plate_tiered`` for several crops, one recognizer call per tier in recognize mode."""
+    timings = {} if timings is None else timings
+    timings.setdefault("preprocess", 0.0)
+    timings.setdefault("ocr", 0.0)
+    skew_angles = list(skew_angles) if skew_angles is not None else [None] * len(crops)
+
+    def run(indices: List[int], run_tier: str) -> Dict[int, Tuple[str, float, Optional[float]]]:
+        t0 = time.perf_counter()
+        prepared = [preprocess_plate_with_angle(crops[i], run_tier, skew_angles[i]) for i in indices]
+        t1 = time.perf_counter()
+        readings = _recognize_batch([processed for processed, _ in prepared])
+        timings["preprocess"] += t1 - t0
+        timings["ocr"] += time.perf_counter() - t1
+        return {i: (text, conf, angle) for i, (text, conf), (_, angle) in zip(indices, readings, prepared)}
+
+    indices = list(range(len(crops)))
+    if not indices:
+        return []
+    if tier != "auto":
+        results = run(indices, tier)
+        return [results[i] for i in indices]
+
+    results = run(indices, "fast")
+    weak = [i for i in indices if results[i][1] < OCR_ESCALATE_BELOW]
+    if weak:
+        for i, (full_text, full_conf, angle) in run(weak, "full").items():
+            raw_text, conf, _ = results[i]
+            if full_conf >= conf:
+                results[i] = (full_text, full_conf, angle)
+            else:
+                results[i] = (raw_text, conf, angle)
+    return [results[i] for i in indices]
+
+
+def _recognize_batch(images: List[np.ndarray]) -> List[Tuple[str, float]]:
+    if OCR_MODE == "recognize":
+        return _recognize_segments(images)
+    return [_recognize(processed) for processed in images]
+
+
+def _recognize_segments(images: List[np.ndarray]) -> List[Tuple[str, float]]:
+    """Recognition without text detection, on the text boxes cut by ``segment_plate``.
+
+    On GPU the plates are stacked into one canvas so all their boxes go through
+    the recognizer as one batch. On CPU EasyOCR recognizes box by box whatever
+    ``batch_size`` is, so stitching would only add copies — each plate is read
+    on its own there; the saving on CPU is the skipped CRAFT detection pass.
+    """
+    reader = _get_reader()
+    if reader.device == "cpu":
+        readings = []
+        for image in images:
+            boxes = segment_plate(image)
+            results = reader.recognize(image, horizontal_list=boxes, free_list=[], detail=1) if boxes else []
+            readings.append(_join_fragments([(box[0][1], box[0][0], text, conf) for box, text, conf in results]))
+        return readings
+
+    width = max(image.shape[1] for image in images)
+    offsets = np.cumsum([0] + [image.shape[0] for image in images])
+    canvas = np.zeros((int(offsets[-1]), width), np.uint8)
+    boxes = []
+    for image, y in zip(images, offsets):
+        canvas[y:y + image.shape[0], :image.shape[1]] = image
+        boxes.extend([x0, x1, y0 + int(y), y1 + int(y)] for x0, x1, y0, y1 in segment_plate(image))
+    if not boxes:
+        return [("", 0.0)] * len(images)
+
+    results = reader.recognize(canvas, horizontal_list=boxes, free_list=[], batch_size=len(boxes), detail=1)
+
+    # Results carry their box; assign each back to its plate
+    per_image: List[list] = [[] for _ in images]
+    for box, text, conf in results:
+        x_min, y_min = box[0]
+        index = int(np.searchsorted(offsets, y_min, side="right")) - 1
+        per_image[index].append((y_min, x_min, text, conf))
+    return [_join_fragments(fragments) for fragments in per_image]
+
+
+def _join_fragments(fragments: list) -> Tuple[str, float]:
+    """(y, x, text, conf) fragments of one plate → (text in reading order, mean confidence)."""
+    fragments = [f for f in sorted(fragments) if f[2].strip()]
+    if not fragments:
+        return "", 0.0
+    raw_text = " ".join(f[2] for f in fragments).strip()
+    return raw_text, float(np.mean([f[3] for f in fragments]))
+
+
+def _recognize(processed: np.ndarray) -> Tuple[str, float]:
     reader = _get_reader()
     results = reader.readtext(processed, detail=1, paragraph=False)
     if not results:
@@ -0,0 +1,129 @@
+"""Out-of-process OCR — plate crops are read by worker processes off the frame loop."""
+from __future__ import annotations
+import os
+import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from vision import metrics
+
+logger = logging.getLogger(__name__)
+
+# Threads each worker may use for torch/OpenCV — workers, not threads, provide the parallelism
+OCR_WORKER_THREADS = int(os.getenv("OCR_WORKER_THREADS", "1"))
+
+# (track_id, raw_text, confidence, skew_angle, {"preprocess": s, "ocr": s})
+OCRResult = Tuple[Hashable, str, float, Optional[float], Dict[str, float]]
+
+
+def _init_worker(num_threads: int):
+    """Warm up the per-process EasyOCR singleton so the first crop is not slow."""
+    import cv2
+    import torch
+    from vision.ocr.ocr_engine import _get_reader
+
+    torch.set_num_threads(num_threads)
+    cv2.setNumThreads(num_threads)
+    _get_reader()
+
+
+def _ocr_task(crop: np.ndarray, skew_angle: Optional[float]) -> Tuple[str, float, Optional[float], Dict[str, float]]:
+    from vision.ocr.ocr_engine import read_plate_tiered
+
+    timings: Dict[str, float] = {}
+    return (*read_plate_tiered(crop, skew_angle, timings=timings), timings)
+
+
+class OCRPool:
+    """Bounded, drop-oldest OCR work queue served by a pool of worker processes.
+
+    Jobs are keyed by ``(owner, track_id)``: at most one job per key is
+    queued or running, and a newer crop for a queued key replaces the older
+    one. When ``max_pending`` jobs are waiting the oldest is dropped, so the
+    frame loop never blocks on OCR. Results are picked up with ``collect()``.
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 8):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(OCR_WORKER_THREADS,),
+        )
+        self._pending: Deque[Tuple[Hashable, Hashable]] = deque()
+        # key → (crop, skew_angle)
+        self._pending_crops: Dict[Tuple[Hashable, Hashable], Tuple[np.ndarray, Optional[float]]] = {}
+        self._in_flight: Dict[Future, Tuple[Hashable, Hashable]] = {}
+        # owner → [(track_id, raw_text, confidence, skew_angle, timings)]
+        self._results: Dict[Hashable, List[OCRResult]] = {}
+        self.submitted = 0
+        self.completed = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def busy(self, owner: Hashable, track_id: Hashable) -> bool:
+        """Return True while a crop for this track is queued or being read."""
+        key = (owner, track_id)
+        return key in self._pending_crops or key in self._in_flight.values()
+
+    def submit(self, owner: Hashable, track_id: Hashable, crop: np.ndarray, skew_angle: Optional[float] = None):
+        key = (owner, track_id)
+        if key not in self._pending_crops:
+            if len(self._pending) >= self.max_pending:
+                oldest = self._pending.popleft()
+                self._pending_crops.pop(oldest, None)
+                self.dropped += 1
+                metrics.OCR_DROPPED.labels(oldest[0]).inc()
+            self._pending.append(key)
+        # Crops may be views into the capture ring buffer — keep our own copy while queued
+        self._pending_crops[key] = (crop.copy(), skew_angle)
+        self._dispatch()
+
+    def collect(self, owner: Hashable) -> List[OCRResult]:
+        """Return (track_id, raw_text, confidence, skew_angle, timings) for every finished job of ``owner``.
+
+        ``timings`` holds the worker's "preprocess" and "ocr" seconds.
+        """
+        self._reap()
+        self._dispatch()
+        return self._results.pop(owner, [])
+
+    def _dispatch(self):
+        # Back-pressure: never more jobs in the executor than there are workers
+        while self._pending and len(self._in_flight) < self.workers:
+            key = self._pending.popleft()
+            crop, skew_angle = self._pending_crops.pop(key)
+            self._in_flight[self._executor.submit(_ocr_task, crop, skew_angle)] = key
+            self.submitted += 1
+
+    def _reap(self):
+        for future in [f for f in self._in_flight if f.done()]:
+            owner, track_id = self._in_flight.pop(future)
+            try:
+                raw_text, confidence, skew_angle, timings = future.result()
+            except Exception as e:
+                self.failed += 1
+                logger.error("OCR worker failed for track %s: %s", track_id, e)
+                continue
+            self.completed += 1
+            self._results.setdefault(owner, []).append((track_id, raw_text, confidence, skew_angle, timings))
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "pending": len(self._pending),
+            "in_flight": len(self._in_flight),
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
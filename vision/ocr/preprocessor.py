@@ -1,56 +1,152 @@
-"""Image preprocessor for license plate OCR."""
+"""Image preprocessor for license plate OCR.
+
+Three tiers trade accuracy for speed:
+
+- ``fast``      grayscale → CLAHE → linear resize (→ rotate by a known skew angle)
+- ``balanced``  fast + Hough deskew estimation
+- ``full``      balanced with cubic resize + non-local-means denoising
+
+``segment_plate`` splits a preprocessed plate into text boxes by projection
+profiles, for recognition without a text detector.
+"""
 from __future__ import annotations
+import threading
+from typing import List, Optional, Tuple
 import cv2
 import numpy as np
 
+TIERS = ("fast", "balanced", "full")
+
+# Standard OCR input width (px)
+_TARGET_W = 300
+
+# Plates narrower than this width/height ratio are read as two text lines
+_TWO_LINE_ASPECT = 2.2
+
+# CLAHE objects are cheap to use but not to build; keep one per thread
+_local = threading.local()
 
-def preprocess_plate(image: np.ndarray) -> np.ndarray:
-    """Apply a robust preprocessing pipeline for OCR accuracy.
 
-    Steps: grayscale → CLAHE → deskew → resize → denoise
+def _clahe() -> cv2.CLAHE:
+    clahe = getattr(_local, "clahe", None)
+    if clahe is None:
+        clahe = _local.clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(4, 4))
+    return clahe
+
+
+def preprocess_plate(image: np.ndarray, tier: str = "full", skew_angle: Optional[float] = None) -> np.ndarray:
+    """Apply the preprocessing pipeline for ``tier``.
+
+    A known ``skew_angle`` (degrees, e.g. cached for the track) skips the
+    Hough estimation and is applied in every tier.
     """
+    return preprocess_plate_with_angle(image, tier, skew_angle)[0]
+
+
+def preprocess_plate_with_angle(
+    image: np.ndarray, tier: str = "full", skew_angle: Optional[float] = None
+) -> Tuple[np.ndarray, Optional[float]]:
+    """Like ``preprocess_plate`` but also return the skew angle used (None if unknown)."""
+    if tier not in TIERS:
+        raise ValueError(f"Unknown preprocessing tier: {tier}")
+
     # 1. Grayscale
     if len(image.shape) == 3:
         gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
     else:
-        gray = image.copy()
+        gray = image
 
     # 2. CLAHE for contrast enhancement
-    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(4, 4))
-    enhanced = clahe.apply(gray)
+    enhanced = _clahe().apply(gray)
 
-    # 3. Resize to a standard width (300 px) keeping aspect ratio
+    # 3. Resize to a standard width keeping aspect ratio
     h, w = enhanced.shape
-    target_w = 300
-    target_h = max(1, int(h * target_w / w))
-    resized = cv2.resize(enhanced, (target_w, target_h), interpolation=cv2.INTER_CUBIC)
+    target_h = max(1, int(h * _TARGET_W / w))
+    interpolation = cv2.INTER_CUBIC if tier == "full" else cv2.INTER_LINEAR
+    resized = cv2.resize(enhanced, (_TARGET_W, target_h), interpolation=interpolation)
 
-    # 4. Deskew via Hough lines
-    resized = _deskew(resized)
+    # 4. Deskew — reuse a known angle, otherwise estimate it (not in the fast tier)
+    if skew_angle is None and tier != "fast":
+        skew_angle = estimate_skew(resized)
+    if skew_angle:
+        resized = _rotate(resized, skew_angle, cv2.INTER_CUBIC if tier == "full" else cv2.INTER_LINEAR)
+
+    if tier != "full":
+        return resized, skew_angle
 
     # 5. Light denoising
     denoised = cv2.fastNlMeansDenoising(resized, h=10)
 
-    return denoised
+    return denoised, skew_angle
 
 
-def _deskew(image: np.ndarray) -> np.ndarray:
-    """Detect dominant angle via Hough lines and rotate to correct skew."""
+def estimate_skew(image: np.ndarray) -> float:
+    """Detect the dominant text-line angle via Hough lines (0.0 if negligible)."""
     edges = cv2.Canny(image, 50, 150)
     lines = cv2.HoughLinesP(edges, 1, np.pi / 180, threshold=60, minLineLength=30, maxLineGap=10)
     if lines is None:
-        return image
+        return 0.0
     angles = []
-    for line in lines:
-        x1, y1, x2, y2 = line[0]
+    for x1, y1, x2, y2 in lines.reshape(-1, 4):
         if x2 != x1:
             angles.append(np.degrees(np.arctan2(y2 - y1, x2 - x1)))
     if not angles:
-        return image
+        return 0.0
     median_angle = float(np.median(angles))
     if abs(median_angle) < 1:
-        return image
+        return 0.0
+    return median_angle
+
+
+def _rotate(image: np.ndarray, angle: float, interpolation: int = cv2.INTER_CUBIC) -> np.ndarray:
     h, w = image.shape
-    M = cv2.getRotationMatrix2D((w / 2, h / 2), median_angle, 1.0)
-    rotated = cv2.warpAffine(image, M, (w, h), flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE)
-    return rotated
+    M = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
+    return cv2.warpAffine(image, M, (w, h), flags=interpolation, borderMode=cv2.BORDER_REPLICATE)
+
+
+def segment_plate(image: np.ndarray) -> List[Tuple[int, int, int, int]]:
+    """Split a preprocessed plate into text boxes (x_min, x_max, y_min, y_max).
+
+    Square plates are split into two lines at the emptiest row of the middle
+    third; each line is cut into groups (digits, تونس, digits) at column gaps
+    wider than a third of the line height. Boxes come top-to-bottom, left-to-right;
+    a line without ink is returned whole.
+    """
+    h, w = image.shape[:2]
+    _, binary = cv2.threshold(image, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    ink = binary > 0
+    if ink.mean() > 0.5:
+        ink = ~ink  # characters are the minority class, whatever the plate's polarity
+    # Plate frame edges span the whole width or height — they are not characters
+    ink[ink.mean(axis=1) > 0.6] = False
+    ink[:, ink.mean(axis=0) > 0.9] = False
+
+    lines = [(0, h)]
+    if w < _TWO_LINE_ASPECT * h and h >= 6:
+        rows = ink.sum(axis=1)
+        split = h // 3 + int(np.argmin(rows[h // 3: 2 * h // 3]))
+        lines = [(0, split), (split, h)]
+
+    boxes = []
+    for y0, y1 in lines:
+        band = ink[y0:y1]
+        line_h = y1 - y0
+        cols = band.sum(axis=0) > max(1, line_h // 20)
+        groups = _column_runs(cols, max_gap=line_h // 3, min_width=max(3, line_h // 8))
+        if not groups:
+            boxes.append((0, w, y0, y1))
+            continue
+        pad = max(1, int(0.15 * line_h))
+        boxes.extend((max(0, a - pad), min(w, b + pad), y0, y1) for a, b in groups)
+    return boxes
+
+
+def _column_runs(cols: np.ndarray, max_gap: int, min_width: int) -> List[Tuple[int, int]]:
+    """Runs of True columns, merged across gaps up to ``max_gap``; narrow runs are dropped."""
+    runs: List[List[int]] = []
+    for x in map(int, np.flatnonzero(cols)):
+        if runs and x - runs[-1][1] <= max_gap:
+            runs[-1][1] = x + 1
+        else:
+            runs.append([x, x + 1])
+    return [(a, b) for a, b in runs if b - a >= min_width]
@@ -0,0 +1,396 @@
+"""Per-gate pipeline — tracking, OCR, classification and posting for one camera."""
+from __future__ import annotations
+import os
+import time
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from vision import metrics
+from vision.camera.motion_gate import MotionGate, parse_roi
+from vision.detector.yolo_detector import VehicleClassifier, find_vehicle
+from vision.ocr.ocr_engine import read_plates_tiered
+from vision.ocr.ocr_pool import OCRPool
+from vision.ocr.postprocessor import post_process
+from vision.tracker.deepsort_tracker import PlateTracker
+from vision.event_poster import SNAPSHOT_MODE, EventPoster, select_snapshot
+
+logger = logging.getLogger(__name__)
+
+OCR_CONFIDENCE_THRESHOLD = float(os.getenv("OCR_CONFIDENCE_THRESHOLD", "0.6"))
+# "frame": post on every frame with a plate (debounced by the poster);
+# "passage": post once per track, when its plate locks or else when the track ends
+EVENT_MODE = os.getenv("EVENT_MODE", "frame")
+EVENT_MODES = ("frame", "passage")
+# "deepsort" (appearance + motion) or "sort" (motion-only IoU/Kalman, no CNN per detection)
+TRACKER_BACKEND = os.getenv("TRACKER_BACKEND", "deepsort")
+# OCR scheduling: lock after N agreeing reads, then re-check every M frames or on a large crop change
+OCR_LOCK_READS = int(os.getenv("OCR_LOCK_READS", "3"))
+OCR_RECHECK_FRAMES = int(os.getenv("OCR_RECHECK_FRAMES", "50"))
+OCR_CHANGE_THRESHOLD = float(os.getenv("OCR_CHANGE_THRESHOLD", "25"))
+# Per-character voting: winning share per character and minimum summed confidence per character
+PLATE_VOTE_AGREEMENT = float(os.getenv("PLATE_VOTE_AGREEMENT", "0.7"))
+PLATE_VOTE_MIN_WEIGHT = float(os.getenv("PLATE_VOTE_MIN_WEIGHT", "1.2"))
+# Motion gating: skip detection on frames with no motion inside the lane ROI.
+# LANE_ROI_<GATE_ID> (e.g. LANE_ROI_GATE_01) overrides LANE_ROI; format "x,y;x,y;x,y".
+MOTION_GATE = os.getenv("MOTION_GATE", "0") == "1"
+MOTION_THRESHOLD = float(os.getenv("MOTION_THRESHOLD", "0.002"))
+MOTION_HOLD_FRAMES = int(os.getenv("MOTION_HOLD_FRAMES", "20"))
+# Detection cadence: run the plate detector every N frames (1 = every frame) and advance
+# tracks by Kalman prediction in between; detect sooner once a predicted centre's std. dev.
+# exceeds DETECT_MAX_UNCERTAINTY × the plate height, or while a track has fewer than
+# DETECT_WARMUP_HITS detections (DeepSORT's velocity estimate settles slowly; SORT needs ~4).
+DETECT_EVERY_N = int(os.getenv("DETECT_EVERY_N", "1"))
+DETECT_MAX_UNCERTAINTY = float(os.getenv("DETECT_MAX_UNCERTAINTY", "0.25"))
+DETECT_WARMUP_HITS = int(os.getenv("DETECT_WARMUP_HITS", "10"))
+
+
+def make_tracker(embedder=None, backend: str = TRACKER_BACKEND) -> PlateTracker:
+    """Build a PlateTracker configured from the environment.
+
+    ``embedder`` shares an existing DeepSORT appearance model (see ``PlateTracker``).
+    """
+    return PlateTracker(
+        vote_agreement=PLATE_VOTE_AGREEMENT,
+        vote_min_weight=PLATE_VOTE_MIN_WEIGHT,
+        lock_reads=OCR_LOCK_READS,
+        lock_confidence=OCR_CONFIDENCE_THRESHOLD,
+        recheck_every=OCR_RECHECK_FRAMES,
+        change_threshold=OCR_CHANGE_THRESHOLD,
+        embedder=embedder,
+        backend=backend,
+    )
+
+
+def make_motion_gate(gate_id: str, roi: str | None = None) -> MotionGate | None:
+    """Build the lane motion gate for a gate, or None when gating is disabled.
+
+    ``roi`` overrides the LANE_ROI_<GATE_ID> / LANE_ROI environment variables.
+    """
+    if not MOTION_GATE:
+        return None
+    if roi is None:
+        roi = os.getenv(f"LANE_ROI_{gate_id.upper()}", os.getenv("LANE_ROI", ""))
+    return MotionGate(
+        roi=parse_roi(roi),
+        min_area_ratio=MOTION_THRESHOLD,
+        hold_frames=MOTION_HOLD_FRAMES,
+    )
+
+
+@dataclass
+class _Passage:
+    """Best reading of one vehicle passage (track), held until it is posted once."""
+    first_seen: float
+    plate: str = ""
+    plate_normalized: str = ""
+    confidence: float = -1.0
+    vehicle_type: str = "car"
+    snapshot: Optional[np.ndarray] = None
+    captured_at: float = 0.0
+    posted: bool = False
+
+
+class GatePipeline:
+    """Everything downstream of plate detection for a single gate.
+
+    The detector is kept outside so that several gates can share one
+    batched forward pass; each gate keeps its own tracker and plate cache.
+    With an ``ocr_pool`` plate crops are read in worker processes and the
+    readings reach the plate cache on a later frame.
+
+    With ``detect_every`` > 1 the frame loop asks ``should_detect`` before
+    running the detector and calls ``process_predicted`` for the frames in
+    between, where tracks move by motion prediction alone.
+
+    With ``event_mode="passage"`` each track posts a single event: as soon
+    as its plate locks, or with its best reading and crop when it ends.
+    """
+
+    def __init__(
+        self,
+        gate_id: str,
+        classifier: VehicleClassifier,
+        poster: EventPoster,
+        tracker: PlateTracker | None = None,
+        ocr_pool: OCRPool | None = None,
+        motion_gate: MotionGate | None = None,
+        detect_every: int = DETECT_EVERY_N,
+        max_uncertainty: float = DETECT_MAX_UNCERTAINTY,
+        warmup_hits: int = DETECT_WARMUP_HITS,
+        event_mode: str = EVENT_MODE,
+    ):
+        if event_mode not in EVENT_MODES:
+            raise ValueError(f"Unknown event mode: {event_mode}")
+        self.gate_id = gate_id
+        self.classifier = classifier
+        self.poster = poster
+        self.tracker = tracker or make_tracker()
+        self.ocr_pool = ocr_pool
+        self.motion_gate = motion_gate if motion_gate is not None else make_motion_gate(gate_id)
+        self.detect_every = max(1, detect_every)
+        self.max_uncertainty = max_uncertainty
+        self.warmup_hits = warmup_hits
+        # Frames since the detector last ran (tracks updated from detections)
+        self._since_detect = 0
+        self.frames_predicted = 0
+        self.event_mode = event_mode
+        # track_id → passage awaiting or done posting (passage mode)
+        self._passages: Dict[int, _Passage] = {}
+
+    def detection_region(self, frame: np.ndarray) -> Optional[Tuple[np.ndarray, Tuple[int, int]]]:
+        """Return (image, offset) to run the plate detector on, or None to skip this frame.
+
+        With a motion gate the image is the lane ROI crop; detections on it
+        must be shifted back by ``offset`` (see ``offset_boxes``).
+        """
+        if self.motion_gate is None:
+            return frame, (0, 0)
+        if not self.motion_gate.has_motion(frame):
+            metrics.FRAMES_IDLE.labels(self.gate_id).inc()
+            return None
+        return self.motion_gate.crop(frame)
+
+    def should_detect(self, frame: np.ndarray) -> bool:
+        """Return True if the detector must run on this frame rather than track prediction.
+
+        Detection runs every ``detect_every`` frames, and sooner while a
+        track is still warming up (confirmation and a usable velocity need
+        consecutive detections), when no confirmed plate is being followed,
+        or when a followed plate's predicted box leaves the frame or becomes
+        too uncertain.
+        """
+        if self._since_detect + 1 >= self.detect_every:
+            return True
+        height, width = frame.shape[:2]
+        followed = False
+        for track in self.tracker.tracks:
+            if track.is_tentative():
+                return True
+            if not track.is_confirmed() or track.time_since_update > self._since_detect:
+                continue  # already lost before the last detection
+            followed = True
+            if track.hits < self.warmup_hits:
+                return True
+            x1, y1, x2, y2 = track.to_ltrb()
+            if x1 < 0 or y1 < 0 or x2 > width or y2 > height:
+                return True
+            if self.tracker.position_uncertainty(track) > self.max_uncertainty:
+                return True
+        return not followed
+
+    def process(self, frame: np.ndarray, plate_boxes: List[Tuple[int, int, int, int, float]]):
+        """Track detected plates, OCR confirmed tracks and post events."""
+        metrics.FRAMES_PROCESSED.labels(self.gate_id).inc()
+        accepted = self._collect_ocr()
+        self._since_detect = 0
+
+        # 1. Format for tracker — updated even without detections so lost tracks expire
+        tracker_inputs = [
+            self.tracker.format_detection(x1, y1, x2, y2, conf)
+            for (x1, y1, x2, y2, conf) in plate_boxes
+        ]
+        with metrics.stage(self.gate_id, "track"):
+            tracks = self.tracker.update(tracker_inputs, frame)
+        if self._passages:
+            self.flush_passages(ended_only=True)
+        if not plate_boxes:
+            return
+        metrics.DETECTIONS.labels(self.gate_id).inc(len(plate_boxes))
+        self._handle_tracks(frame, tracks, accepted)
+
+    def process_predicted(self, frame: np.ndarray):
+        """Advance tracks by motion prediction on a frame the detector skipped.
+
+        Plates followed since the last detection are OCR'd and posted from
+        their predicted boxes, exactly as on a detection frame.
+        """
+        metrics.FRAMES_PROCESSED.labels(self.gate_id).inc()
+        metrics.FRAMES_PREDICTED.labels(self.gate_id).inc()
+        self.frames_predicted += 1
+        accepted = self._collect_ocr()
+        self._since_detect += 1
+        with metrics.stage(self.gate_id, "track"):
+            tracks = self.tracker.predict()
+        followed = [t for t in tracks if t.time_since_update <= self._since_detect]
+        self._handle_tracks(frame, followed, accepted)
+
+    def _collect_ocr(self) -> Dict[int, str]:
+        """Apply finished OCR pool readings; return track_id → raw text of readings accepted now."""
+        accepted: Dict[int, str] = {}
+        if self.ocr_pool is None:
+            return accepted
+        for track_id, raw_text, ocr_conf, skew_angle, timings in self.ocr_pool.collect(self.gate_id):
+            self._observe_ocr(timings)
+            if not self.tracker.is_active(track_id):
+                continue  # the track ended while its crop was being read
+            self.tracker.cache_skew(track_id, skew_angle)
+            plate_raw = self._apply_reading(track_id, raw_text, ocr_conf)
+            if plate_raw is not None:
+                accepted[track_id] = plate_raw
+        return accepted
+
+    def _handle_tracks(self, frame: np.ndarray, tracks: list, accepted: Dict[int, str]):
+        """OCR, classify and post every confirmed track at its current (detected or predicted) box."""
+        # Vehicle boxes are detected at most once per frame, and only while some track needs them
+        vehicles = None
+
+        # 2. Run OCR on crops unless the track's reading is locked; inline reads are batched per frame
+        visible = []
+        batch: List[Tuple[int, np.ndarray]] = []
+        for track in tracks:
+            if not track.is_confirmed():
+                continue
+            track_id = track.track_id
+            passage = None
+            if self.event_mode == "passage":
+                passage = self._passages.get(track_id)
+                if passage is None:
+                    passage = self._passages[track_id] = _Passage(first_seen=time.time())
+            ltrb = track.to_ltrb()
+            x1, y1, x2, y2 = map(int, ltrb)
+            # Clamp to frame
+            x1, y1 = max(0, x1), max(0, y1)
+            x2, y2 = min(frame.shape[1], x2), min(frame.shape[0], y2)
+            crop = frame[y1:y2, x1:x2]
+            if crop.size == 0:
+                continue
+            visible.append((track_id, (x1, y1, x2, y2), passage))
+
+            if self.ocr_pool is not None:
+                if not self.ocr_pool.busy(self.gate_id, track_id) and self._should_ocr(track_id, crop):
+                    self.ocr_pool.submit(self.gate_id, track_id, crop, self.tracker.get_skew(track_id))
+            elif self._should_ocr(track_id, crop):
+                batch.append((track_id, crop))
+
+        if batch:
+            timings: Dict[str, float] = {}
+            readings = read_plates_tiered(
+                [crop for _, crop in batch], [self.tracker.get_skew(track_id) for track_id, _ in batch], timings=timings
+            )
+            self._observe_ocr(timings)
+            for (track_id, _), (raw_text, ocr_conf, skew_angle) in zip(batch, readings):
+                self.tracker.cache_skew(track_id, skew_angle)
+                plate_raw = self._apply_reading(track_id, raw_text, ocr_conf)
+                if plate_raw is not None:
+                    accepted[track_id] = plate_raw
+
+        for track_id, (x1, y1, x2, y2), passage in visible:
+            plate_raw = accepted.get(track_id)
+            cached = self.tracker.get_plate(track_id)
+            if cached is None:
+                continue
+
+            plate_normalized, best_conf = cached
+            if passage is not None:
+                improved = best_conf > passage.confidence
+                if passage.posted or not (improved or self.tracker.is_locked(track_id)):
+                    continue
+            elif plate_raw is None:
+                if not self.tracker.is_locked(track_id):
+                    continue
+                # Locked track skipped OCR this frame — re-post its cached reading
+                plate_raw = plate_normalized
+
+            # 4. Classify the vehicle carrying this plate until its type is stable
+            needs_type = self.tracker.needs_vehicle_type(track_id)
+            if needs_type and vehicles is None:
+                with metrics.stage(self.gate_id, "vehicle"):
+                    vehicles = self.classifier.detect_vehicles(frame)
+            # Also reused for the snapshot crop whenever vehicles were detected this frame
+            vehicle = find_vehicle((x1, y1, x2, y2), vehicles) if vehicles else None
+            if needs_type and vehicle is not None:
+                self.tracker.cache_vehicle_type(track_id, vehicle[4], vehicle[5])
+            vehicle_type, _ = self.tracker.get_vehicle_type(track_id)
+
+            if passage is not None:
+                # 5. Keep the passage's best reading and crop; post once the plate is final
+                passage.vehicle_type = vehicle_type
+                if improved:
+                    passage.plate = plate_raw or plate_normalized
+                    passage.plate_normalized, passage.confidence = plate_normalized, best_conf
+                    passage.snapshot = select_snapshot(
+                        frame, SNAPSHOT_MODE, (x1, y1, x2, y2), vehicle[:4] if vehicle is not None else None
+                    )
+                    passage.captured_at = time.time()
+                if self.tracker.is_locked(track_id):
+                    self._post_passage(passage)
+                continue
+
+            # 5. Post event (debounced)
+            with metrics.stage(self.gate_id, "enqueue"):
+                self.poster.post_event(
+                    plate=plate_raw,
+                    plate_normalized=plate_normalized,
+                    gate_id=self.gate_id,
+                    ocr_confidence=best_conf,
+                    vehicle_type=vehicle_type,
+                    snapshot=frame,
+                    plate_box=(x1, y1, x2, y2),
+                    vehicle_box=vehicle[:4] if vehicle is not None else None,
+                )
+
+    def flush_passages(self, ended_only: bool = False):
+        """Post the best reading of passages whose track has ended (or of all, at shutdown)."""
+        for track_id in list(self._passages):
+            if ended_only and self.tracker.is_active(track_id):
+                continue
+            passage = self._passages.pop(track_id)
+            if not passage.posted and passage.plate_normalized:
+                self._post_passage(passage)
+
+    def _post_passage(self, passage: _Passage):
+        passage.posted = True
+        logger.debug(
+            "Passage %s at %s: %.1fs in view", passage.plate_normalized, self.gate_id, time.time() - passage.first_seen
+        )
+        with metrics.stage(self.gate_id, "enqueue"):
+            self.poster.post_event(
+                plate=passage.plate,
+                plate_normalized=passage.plate_normalized,
+                gate_id=self.gate_id,
+                ocr_confidence=passage.confidence,
+                vehicle_type=passage.vehicle_type,
+                snapshot=passage.snapshot,
+                captured_at=passage.captured_at,
+            )
+        passage.snapshot = None
+
+    def _should_ocr(self, track_id: int, crop: np.ndarray) -> bool:
+        if self.tracker.should_ocr(track_id, crop):
+            metrics.OCR_CALLS.labels(self.gate_id).inc()
+            return True
+        metrics.OCR_SKIPPED.labels(self.gate_id).inc()
+        return False
+
+    def _observe_ocr(self, timings: Dict[str, float]):
+        for stage, seconds in timings.items():
+            metrics.observe_stage(self.gate_id, stage, seconds)
+
+    def _apply_reading(self, track_id: int, raw_text: str, ocr_conf: float) -> Optional[str]:
+        """Post-process an OCR reading; return the plate text to post if one is accepted.
+
+        A whole reading is accepted when it is valid and confident enough;
+        otherwise the per-character vote may still reach a consensus.
+        """
+        result = post_process(raw_text, ocr_conf)
+        consensus = self.tracker.vote_plate(track_id, result["normalized"], result["confidence"])
+        if result["valid"] and result["confidence"] >= OCR_CONFIDENCE_THRESHOLD:
+            # 3. Update plate cache with best reading
+            self.tracker.cache_plate(track_id, result["normalized"], result["confidence"])
+            self.tracker.record_reading(track_id, result["normalized"], result["confidence"])
+            return result["plate"]
+        if consensus is not None:
+            return consensus[0]
+        return None
+
+    @property
+    def stats(self) -> dict:
+        stats = {"gate_id": self.gate_id, **self.tracker.ocr_stats}
+        if self.motion_gate is not None:
+            stats["frames_skipped"] = self.motion_gate.frames_skipped
+        if self.detect_every > 1:
+            stats["frames_predicted"] = self.frames_predicted
+        return stats
@@ -0,0 +1,125 @@
+"""Multi-gate supervisor — runs every gate of a site in one process.
+
+One copy of each model is loaded (plate detector, vehicle classifier,
+EasyOCR reader, DeepSORT embedder) and shared by all gates; trackers,
+plate caches and motion gates stay per gate. Torch and OpenCV thread pools
+are sized explicitly so the gates don't oversubscribe the cores.
+
+Usage:
+    python -m vision.supervisor gates.json      # or SUPERVISOR_CONFIG=gates.json
+
+See ``gates.example.json``. A ``lane_roi`` is used when MOTION_GATE=1.
+
+Config:
+    {
+      "fps_limit": 10,
+      "ocr_workers": 2,
+      "threads": {"torch": 4, "opencv": 1},
+      "gates": [
+        {"gate_id": "gate_01", "stream_source": "rtsp://cam1/stream"},
+        {"gate_id": "gate_02", "stream_source": "0", "lane_roi": "100,400;1180,400;1180,720;100,720"}
+      ]
+    }
+"""
+from __future__ import annotations
+import json
+import os
+import sys
+import logging
+from typing import Dict
+
+import cv2
+
+from vision import metrics
+from vision.main import OCR_QUEUE_SIZE, OCR_WORKERS, make_gates, make_ocr_pool, parse_source, serve_gates
+
+logger = logging.getLogger("vision.supervisor")
+
+SUPERVISOR_CONFIG = os.getenv("SUPERVISOR_CONFIG", "gates.json")
+
+
+def load_config(path: str) -> dict:
+    """Read and validate the gates config."""
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    gates = config.get("gates") or []
+    if not gates:
+        raise ValueError(f"{path}: no gates configured")
+    seen = set()
+    for gate in gates:
+        if "gate_id" not in gate or "stream_source" not in gate:
+            raise ValueError(f"{path}: each gate needs gate_id and stream_source: {gate}")
+        if gate["gate_id"] in seen:
+            raise ValueError(f"{path}: duplicate gate_id {gate['gate_id']}")
+        seen.add(gate["gate_id"])
+    return config
+
+
+def apply_thread_limits(ocr_workers: int, threads: dict | None = None):
+    """Size the torch and OpenCV thread pools for the whole process.
+
+    By default torch gets the cores not taken by OCR worker processes (one
+    pool serves every gate's detector and embedder) and OpenCV gets one
+    thread — its per-frame work is small and its pool would otherwise
+    compete with torch's.
+    """
+    threads = threads or {}
+    cpus = os.cpu_count() or 1
+    torch_threads = int(threads.get("torch", max(1, cpus - ocr_workers)))
+    opencv_threads = int(threads.get("opencv", 1))
+
+    cv2.setNumThreads(opencv_threads)
+    try:
+        import torch
+    except ImportError:  # ONNX-only deployment
+        torch = None
+    if torch is not None:
+        torch.set_num_threads(torch_threads)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            # Only settable before the first parallel op; keep torch's choice
+            pass
+    logger.info("Thread limits: torch=%d opencv=%d (%d CPUs, %d OCR workers)",
+                torch_threads, opencv_threads, cpus, ocr_workers)
+
+
+def run_supervisor(config: dict):
+    from vision.camera.multi_stream import MultiStreamHandler
+    from vision.detector.yolo_detector import PlateDetector, VehicleClassifier
+    from vision.event_poster import EventPoster
+
+    gate_configs = config["gates"]
+    ocr_workers = int(config.get("ocr_workers", OCR_WORKERS))
+    apply_thread_limits(ocr_workers, config.get("threads"))
+
+    sources: Dict[str, str | int] = {
+        g["gate_id"]: parse_source(str(g["stream_source"])) for g in gate_configs
+    }
+    lane_rois = {g["gate_id"]: g["lane_roi"] for g in gate_configs if "lane_roi" in g}
+    logger.info("Supervisor starting %d gates: %s", len(sources), ", ".join(sources))
+
+    streams = MultiStreamHandler(sources, fps_limit=int(config.get("fps_limit", 10)))
+    detector = PlateDetector()
+    classifier = VehicleClassifier()
+    poster = EventPoster()
+    ocr_pool = make_ocr_pool(ocr_workers, int(config.get("ocr_queue_size", OCR_QUEUE_SIZE)))
+    gates = make_gates(list(sources), classifier, poster, ocr_pool, lane_rois)
+
+    streams.start()
+    metrics.start_server(int(config.get("metrics_port", metrics.METRICS_PORT)))
+    try:
+        serve_gates(streams, detector, gates)
+    except KeyboardInterrupt:
+        logger.info("Shutting down supervisor...")
+    finally:
+        streams.stop()
+        for gate in gates.values():
+            gate.flush_passages()
+        poster.close()
+        if ocr_pool is not None:
+            ocr_pool.shutdown()
+
+
+if __name__ == "__main__":
+    run_supervisor(load_config(sys.argv[1] if len(sys.argv) > 1 else SUPERVISOR_CONFIG))
@@ -0,0 +1,26 @@
+import threading
+
+from vision.event_poster import Debouncer, EventPoster, EventSpool
+
+
+def test_close_spools_the_event_a_hung_request_holds(tmp_path):
+    spool = EventSpool(str(tmp_path / "events.jsonl"), dead_letter_path=str(tmp_path / "dead.jsonl"))
+    poster = EventPoster(spool=spool, debouncer=Debouncer(None))
+    sending, release = threading.Event(), threading.Event()
+
+    def hang(payload):
+        sending.set()
+        release.wait(10)
+        raise ConnectionError("backend hung up")
+
+    poster.send_event = hang
+    assert poster.post_event("123 TN 4567", "123TN4567", "gate-1", 0.9, "car")
+    assert sending.wait(5)
+
+    poster.close(timeout=0.2)
+    assert [e["plate"] for e in spool.peek_many(10)] == ["123TN4567"]
+
+    # The sender gives up afterwards; the event must not be spooled twice
+    release.set()
+    poster._thread.join(5)
+    assert spool.records == 1
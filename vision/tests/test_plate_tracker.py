@@ -0,0 +1,34 @@
+from vision.tracker.deepsort_tracker import PlateTracker
+
+PLATE = "123TN4567"
+
+
+def _read(tracker, track_id, plate, confidence, threshold=0.7):
+    """The pipeline's order (GatePipeline._apply_reading): vote first, then cache a confident reading."""
+    tracker.vote_plate(track_id, plate, confidence)
+    if confidence >= threshold:
+        tracker.cache_plate(track_id, plate, confidence)
+
+
+def test_consensus_keeps_a_better_whole_reading():
+    tracker = PlateTracker(backend="sort")
+    _read(tracker, 1, PLATE, 0.95)
+    _read(tracker, 1, PLATE, 0.5)
+    _read(tracker, 1, PLATE, 0.5)
+    assert tracker.get_plate(1) == (PLATE, 0.95)
+
+
+def test_consensus_replaces_a_different_plate():
+    tracker = PlateTracker(backend="sort")
+    tracker.cache_plate(1, "123TN4561", 0.9)
+    for _ in range(4):
+        tracker.vote_plate(1, PLATE, 0.6)
+    plate, _ = tracker.get_plate(1)
+    assert plate == PLATE
+
+
+def test_consensus_fills_an_empty_cache():
+    tracker = PlateTracker(backend="sort")
+    for _ in range(3):
+        tracker.vote_plate(1, PLATE, 0.5)
+    assert tracker.get_plate(1) == (PLATE, 0.5)
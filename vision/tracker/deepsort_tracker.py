@@ -1,29 +1,283 @@
 """DeepSORT tracker with per-track plate cache to reduce OCR load."""
 from __future__ import annotations
+from collections import OrderedDict
+from dataclasses import dataclass
 from typing import Dict, Optional, Tuple
+import cv2
 import numpy as np
 from deep_sort_realtime.deepsort_tracker import DeepSort
 
+from vision.tracker.plate_voter import PlateVoter
+from vision.tracker.sort_tracker import SortTracker
+
+TRACKER_BACKENDS = ("deepsort", "sort")
+
+# Crops are compared on a tiny grayscale thumbnail to detect large appearance changes
+_THUMB_SIZE = (32, 16)
+
+
+@dataclass
+class _OCRSchedule:
+    """Per-track OCR scheduling state."""
+    last_plate: str = ""
+    agreeing_reads: int = 0
+    locked: bool = False
+    frames_since_ocr: int = 0
+    thumb: Optional[np.ndarray] = None
+
+
+@dataclass
+class _VehicleVote:
+    """Per-track vehicle type, stable once the classifier agrees with itself."""
+    vehicle_type: str = "car"
+    confidence: float = 0.0
+    streak: int = 0
+    stable: bool = False
+
 
 class PlateTracker:
-    """Wrap DeepSORT and maintain a plate cache keyed by track ID."""
+    """Wrap DeepSORT and maintain a plate cache keyed by track ID.
+
+    Once a track has ``lock_reads`` agreeing readings at or above
+    ``lock_confidence`` its plate is locked: OCR is then only re-run every
+    ``recheck_every`` frames, or sooner when the crop changes by more than
+    ``change_threshold`` (mean absolute grey-level difference).
+
+    Every aligned reading, even a low-confidence one, also votes character
+    by character in a per-track ``PlateVoter``; a confident consensus
+    replaces the cached plate and locks the track.
 
-    def __init__(self, max_age: int = 30, n_init: int = 3):
-        self._tracker = DeepSort(max_age=max_age, n_init=n_init)
+    The vehicle type is cached per track as well and stops being
+    re-classified after ``vehicle_stable_reads`` identical results in a row.
+
+    ``backend="sort"`` replaces DeepSORT with the motion-only
+    ``SortTracker`` (no appearance CNN). Otherwise pass the ``embedder`` of
+    another tracker to share one appearance model between gates instead of
+    loading a copy per tracker.
+
+    Per-track state is evicted when DeepSORT deletes the track. As a
+    backstop it is also bounded to the ``max_tracks`` most recently used
+    track IDs.
+    """
+
+    def __init__(
+        self,
+        max_age: int = 30,
+        n_init: int = 3,
+        lock_reads: int = 3,
+        lock_confidence: float = 0.6,
+        recheck_every: int = 50,
+        change_threshold: float = 25.0,
+        vehicle_stable_reads: int = 3,
+        vote_agreement: float = 0.7,
+        vote_min_weight: float = 1.2,
+        embedder=None,
+        max_tracks: int = 256,
+        backend: str = "deepsort",
+    ):
+        if backend not in TRACKER_BACKENDS:
+            raise ValueError(f"Unknown tracker backend: {backend}")
+        if backend == "sort":
+            self._tracker = SortTracker(max_age=max_age, n_init=n_init)
+        elif embedder is None:
+            self._tracker = DeepSort(max_age=max_age, n_init=n_init)
+        else:
+            self._tracker = DeepSort(max_age=max_age, n_init=n_init, embedder=None)
+            self._tracker.embedder = embedder
         # track_id → (plate_normalized, confidence)
         self._plate_cache: Dict[int, Tuple[str, float]] = {}
+        # track_id → OCR scheduling state
+        self._ocr_schedule: Dict[int, _OCRSchedule] = {}
+        # track_id → per-character consensus of all readings
+        self._voters: Dict[int, PlateVoter] = {}
+        # track_id → plate skew angle (degrees) estimated by OCR preprocessing
+        self._skew_angles: Dict[int, float] = {}
+        # track_id → vehicle type vote
+        self._vehicle_types: Dict[int, _VehicleVote] = {}
+        # track_id → None, least recently used first
+        self._recent: "OrderedDict[int, None]" = OrderedDict()
+        self.max_tracks = max_tracks
+        self.evicted = 0
+        self.lock_reads = lock_reads
+        self.lock_confidence = lock_confidence
+        self.recheck_every = recheck_every
+        self.change_threshold = change_threshold
+        self.vehicle_stable_reads = vehicle_stable_reads
+        self.vote_agreement = vote_agreement
+        self.vote_min_weight = vote_min_weight
+        self.ocr_calls = 0
+        self.ocr_skipped = 0
+
+    @property
+    def embedder(self):
+        """The DeepSORT appearance embedder (shareable across trackers); None for SORT."""
+        return self._tracker.embedder
 
     def update(
         self,
         detections: list,  # list of ([x1,y1,w,h], confidence, "plate")
         frame: np.ndarray,
     ) -> list:
-        """Update tracker and return active tracks as list of Track objects."""
-        if not detections:
-            return []
-        return self._tracker.update_tracks(detections, frame=frame)
+        """Update tracker and return active tracks as list of Track objects.
+
+        Call this on every frame, with an empty list when nothing was
+        detected, so that lost tracks age out and their state is evicted.
+        """
+        tracks = self._tracker.update_tracks(detections, frame=frame)
+        for track_id in self._tracker.tracker.del_tracks_ids:
+            self.remove_track(track_id)
+        for track in tracks:
+            if track.time_since_update == 0:
+                self._touch(track.track_id)
+        return tracks
+
+    def predict(self) -> list:
+        """Advance every track by its motion model alone, for a frame without detection.
+
+        Tracks keep their IDs and per-track state; ``time_since_update``
+        grows by one, so the next ``update`` re-associates them as briefly
+        missed tracks. Returns the current tracks with predicted boxes.
+        """
+        core = self._tracker.tracker
+        core.predict()
+        return list(core.tracks)
+
+    @property
+    def tracks(self) -> list:
+        return list(self._tracker.tracker.tracks)
 
+    @staticmethod
+    def position_uncertainty(track) -> float:
+        """Kalman std. dev. of the track's predicted centre, relative to its box height."""
+        cov = track.covariance
+        _, y1, _, y2 = track.to_ltrb()
+        return float(np.sqrt(cov[0, 0] + cov[1, 1])) / max(float(y2 - y1), 1.0)
+
+    def is_active(self, track_id: int) -> bool:
+        """Return True while DeepSORT still tracks ``track_id`` (its state is kept)."""
+        return track_id in self._recent
+
+    def _touch(self, track_id: int):
+        if track_id in self._recent:
+            self._recent.move_to_end(track_id)
+            return
+        self._recent[track_id] = None
+        while len(self._recent) > self.max_tracks:
+            oldest = next(iter(self._recent))
+            self.remove_track(oldest)
+            self.evicted += 1
+
+    # ── OCR scheduling ─────────────────────────────────────────────────────
+    def should_ocr(self, track_id: int, crop: np.ndarray) -> bool:
+        """Return True if this track's crop should go through OCR this frame."""
+        self._touch(track_id)
+        state = self._ocr_schedule.setdefault(track_id, _OCRSchedule())
+        if state.locked:
+            state.frames_since_ocr += 1
+            if state.frames_since_ocr < self.recheck_every and not self._crop_changed(state, crop):
+                self.ocr_skipped += 1
+                return False
+        state.frames_since_ocr = 0
+        state.thumb = _thumbnail(crop)
+        self.ocr_calls += 1
+        return True
+
+    def record_reading(self, track_id: int, plate: str, confidence: float):
+        """Feed a valid OCR reading into the lock decision for this track."""
+        self._touch(track_id)
+        state = self._ocr_schedule.setdefault(track_id, _OCRSchedule())
+        if confidence < self.lock_confidence:
+            return
+        if plate == state.last_plate:
+            state.agreeing_reads += 1
+        else:
+            # A confident disagreement unlocks the track until readings agree again
+            state.last_plate = plate
+            state.agreeing_reads = 1
+            state.locked = False
+        if state.agreeing_reads >= self.lock_reads:
+            state.locked = True
+
+    def vote_plate(self, track_id: int, plate: str, confidence: float) -> Optional[Tuple[str, float]]:
+        """Add a normalized reading to the track's character vote.
+
+        Returns (plate, confidence) once the consensus is final; the consensus
+        then becomes the cached plate and the track is locked.
+        """
+        self._touch(track_id)
+        voter = self._voters.get(track_id)
+        if voter is None:
+            voter = self._voters[track_id] = PlateVoter(self.vote_agreement, self.vote_min_weight)
+        if not voter.add(plate, confidence):
+            return None
+        consensus = voter.consensus()
+        if consensus is None:
+            return None
+        # A consensus replaces a different plate, but never a better reading of the same one
+        cached = self._plate_cache.get(track_id)
+        if cached is not None and cached[0] != consensus[0]:
+            self._plate_cache[track_id] = consensus
+        else:
+            self.cache_plate(track_id, *consensus)
+        state = self._ocr_schedule.setdefault(track_id, _OCRSchedule())
+        state.last_plate, state.locked = consensus[0], True
+        state.agreeing_reads = max(state.agreeing_reads, self.lock_reads)
+        return consensus
+
+    def is_locked(self, track_id: int) -> bool:
+        state = self._ocr_schedule.get(track_id)
+        return state is not None and state.locked
+
+    def _crop_changed(self, state: _OCRSchedule, crop: np.ndarray) -> bool:
+        if state.thumb is None:
+            return True
+        diff = cv2.absdiff(_thumbnail(crop), state.thumb)
+        return float(diff.mean()) > self.change_threshold
+
+    @property
+    def ocr_stats(self) -> dict:
+        return {
+            "ocr_calls": self.ocr_calls,
+            "ocr_skipped": self.ocr_skipped,
+            "locked_tracks": sum(1 for s in self._ocr_schedule.values() if s.locked),
+            "tracked": len(self._recent),
+            "evicted": self.evicted,
+        }
+
+    def get_skew(self, track_id: int) -> Optional[float]:
+        return self._skew_angles.get(track_id)
+
+    def cache_skew(self, track_id: int, angle: Optional[float]):
+        if angle is not None:
+            self._touch(track_id)
+            self._skew_angles[track_id] = angle
+
+    # ── Vehicle type cache ─────────────────────────────────────────────────
+    def needs_vehicle_type(self, track_id: int) -> bool:
+        vote = self._vehicle_types.get(track_id)
+        return vote is None or not vote.stable
+
+    def cache_vehicle_type(self, track_id: int, vehicle_type: str, confidence: float):
+        self._touch(track_id)
+        vote = self._vehicle_types.setdefault(track_id, _VehicleVote())
+        if vote.stable:
+            return
+        if vehicle_type == vote.vehicle_type and vote.streak:
+            vote.streak += 1
+            vote.confidence = max(vote.confidence, confidence)
+        else:
+            vote.vehicle_type, vote.confidence, vote.streak = vehicle_type, confidence, 1
+        vote.stable = vote.streak >= self.vehicle_stable_reads
+
+    def get_vehicle_type(self, track_id: int) -> Tuple[str, float]:
+        vote = self._vehicle_types.get(track_id)
+        if vote is None:
+            return "car", 0.0
+        return vote.vehicle_type, vote.confidence
+
+    # ── Plate cache ────────────────────────────────────────────────────────
     def cache_plate(self, track_id: int, plate: str, confidence: float):
+        self._touch(track_id)
         existing = self._plate_cache.get(track_id)
         if existing is None or confidence > existing[1]:
             self._plate_cache[track_id] = (plate, confidence)
@@ -32,8 +286,18 @@ class PlateTracker:
         return self._plate_cache.get(track_id)
 
     def remove_track(self, track_id: int):
+        self._recent.pop(track_id, None)
         self._plate_cache.pop(track_id, None)
+        self._ocr_schedule.pop(track_id, None)
+        self._vehicle_types.pop(track_id, None)
+        self._skew_angles.pop(track_id, None)
+        self._voters.pop(track_id, None)
 
     def format_detection(self, x1, y1, x2, y2, conf) -> list:
         """Convert xyxy bbox to DeepSORT's expected [x1, y1, w, h] format."""
         return [[x1, y1, x2 - x1, y2 - y1], conf, "plate"]
+
+
+def _thumbnail(crop: np.ndarray) -> np.ndarray:
+    gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY) if crop.ndim == 3 else crop
+    return cv2.resize(gray, _THUMB_SIZE, interpolation=cv2.INTER_AREA)
@@ -0,0 +1,74 @@
+"""Temporal per-character plate voting across OCR readings of one track."""
+from __future__ import annotations
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Normalized readings are aligned around the "TN" separator:
+#   prefix of 1-3 digits right-aligned into 3 slots (a slot may be empty), suffix 4 digits.
+#   Anything else (e.g. a 5-digit prefix) is not voted — truncating it could
+#   produce a consensus that was never read.
+_PREFIX_SLOTS = 3
+_SUFFIX_SLOTS = 4
+_ALIGN_RE = re.compile(r"^(\d{1,3})TN(\d{4})$")
+_EMPTY = ""
+
+
+class PlateVoter:
+    """Confidence-weighted character voting over successive normalized readings.
+
+    Each reading votes for one symbol per slot with its OCR confidence. The
+    consensus is final once every slot has at least ``min_weight`` total
+    vote weight and its winning symbol holds ``min_agreement`` of it —
+    usually after a few mediocre reads, well before any single read clears
+    the whole-string confidence threshold.
+    """
+
+    def __init__(self, min_agreement: float = 0.7, min_weight: float = 1.2):
+        self.min_agreement = min_agreement
+        self.min_weight = min_weight
+        self._votes: List[Dict[str, float]] = [{} for _ in range(_PREFIX_SLOTS + _SUFFIX_SLOTS)]
+        self._counts: List[Dict[str, int]] = [{} for _ in range(_PREFIX_SLOTS + _SUFFIX_SLOTS)]
+        self.readings = 0
+
+    @staticmethod
+    def align(normalized: str) -> Optional[List[str]]:
+        """Split a normalized reading into per-slot symbols, or None if it can't be aligned."""
+        m = _ALIGN_RE.match(normalized)
+        if m is None:
+            return None
+        prefix = m.group(1)
+        slots = [_EMPTY] * (_PREFIX_SLOTS - len(prefix)) + list(prefix)
+        return slots + list(m.group(2))
+
+    def add(self, normalized: str, confidence: float) -> bool:
+        """Add one reading; return False if it could not be aligned."""
+        slots = self.align(normalized)
+        if slots is None or confidence <= 0:
+            return False
+        for votes, counts, symbol in zip(self._votes, self._counts, slots):
+            votes[symbol] = votes.get(symbol, 0.0) + confidence
+            counts[symbol] = counts.get(symbol, 0) + 1
+        self.readings += 1
+        return True
+
+    def consensus(self) -> Optional[Tuple[str, float]]:
+        """Return (plate, confidence) once every slot is decided, else None.
+
+        ``confidence`` is an OCR confidence (0-1): the mean, over the slots, of
+        the average confidence of the readings that voted for the winning symbol.
+        """
+        if not self.readings:
+            return None
+        symbols, confidences = [], []
+        for votes, counts in zip(self._votes, self._counts):
+            total = sum(votes.values())
+            symbol, weight = max(votes.items(), key=lambda kv: kv[1])
+            if total < self.min_weight or weight / total < self.min_agreement:
+                return None
+            symbols.append(symbol)
+            confidences.append(weight / counts[symbol])
+        prefix = "".join(symbols[:_PREFIX_SLOTS])
+        # Empty slots may only pad the left of the prefix
+        if not prefix or _EMPTY in symbols[_PREFIX_SLOTS - len(prefix):_PREFIX_SLOTS]:
+            return None
+        return f"{prefix}TN{''.join(symbols[_PREFIX_SLOTS:])}", round(sum(confidences) / len(confidences), 3)
@@ -0,0 +1,218 @@
+"""Motion-only plate tracker — Kalman filter + IoU association, no appearance model.
+
+A SORT/ByteTrack-style alternative to DeepSORT for single-lane cameras,
+where plates barely overlap and appearance embeddings are not worth a CNN
+pass per detection. It mirrors the parts of the ``DeepSort`` API that
+``PlateTracker`` uses (``update_tracks``, ``tracker.del_tracks_ids``,
+``embedder``, and Track objects), so it can be swapped in directly.
+"""
+from __future__ import annotations
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Track states, as in deep_sort_realtime
+_TENTATIVE, _CONFIRMED, _DELETED = 1, 2, 3
+
+
+class _KalmanBox:
+    """Constant-velocity Kalman filter over (cx, cy, area, aspect ratio) as in SORT."""
+
+    _F = np.eye(7)
+    _F[0, 4] = _F[1, 5] = _F[2, 6] = 1.0
+    _H = np.eye(4, 7)
+    _Q = np.eye(7)
+    _Q[4:, 4:] *= 0.01
+    _Q[-1, -1] *= 0.01
+    _R = np.eye(4)
+    _R[2:, 2:] *= 10.0
+
+    def __init__(self, ltrb: np.ndarray):
+        self.x = np.zeros(7)
+        self.x[:4] = _to_z(ltrb)
+        self.P = np.eye(7) * 10.0
+        self.P[4:, 4:] *= 1000.0  # velocities are unknown at first
+
+    def predict(self):
+        if self.x[2] + self.x[6] <= 0:
+            self.x[6] = 0.0
+        self.x = self._F @ self.x
+        self.P = self._F @ self.P @ self._F.T + self._Q
+
+    def update(self, ltrb: np.ndarray):
+        y = _to_z(ltrb) - self._H @ self.x
+        S = self._H @ self.P @ self._H.T + self._R
+        K = self.P @ self._H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ y
+        self.P = (np.eye(7) - K @ self._H) @ self.P
+
+    def ltrb(self) -> np.ndarray:
+        cx, cy, s, r = self.x[:4]
+        w = np.sqrt(max(s * r, 0.0))
+        h = s / w if w > 0 else 0.0
+        return np.array([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2])
+
+
+def _to_z(ltrb: np.ndarray) -> np.ndarray:
+    w, h = ltrb[2] - ltrb[0], ltrb[3] - ltrb[1]
+    return np.array([ltrb[0] + w / 2, ltrb[1] + h / 2, w * h, w / float(h) if h else 0.0])
+
+
+class SortTrack:
+    """One tracked plate; same accessors as a deep_sort_realtime Track."""
+
+    def __init__(self, track_id: str, ltrb: np.ndarray, confidence: float, det_class, n_init: int, max_age: int):
+        self.track_id = track_id
+        self.hits = 1
+        self.age = 1
+        self.time_since_update = 0
+        self.state = _TENTATIVE
+        self.det_conf = confidence
+        self.det_class = det_class
+        self._n_init = n_init
+        self._max_age = max_age
+        self._kf = _KalmanBox(ltrb)
+
+    def predict(self):
+        self._kf.predict()
+        self.age += 1
+        self.time_since_update += 1
+
+    def update(self, ltrb: np.ndarray, confidence: float):
+        self._kf.update(ltrb)
+        self.det_conf = confidence
+        self.hits += 1
+        self.time_since_update = 0
+        if self.state == _TENTATIVE and self.hits >= self._n_init:
+            self.state = _CONFIRMED
+
+    def mark_missed(self):
+        if self.state == _TENTATIVE or self.time_since_update > self._max_age:
+            self.state = _DELETED
+
+    @property
+    def covariance(self) -> np.ndarray:
+        # State covariance; the first two dimensions are the box centre, as in DeepSORT
+        return self._kf.P
+
+    def to_ltrb(self, orig: bool = False) -> np.ndarray:
+        return self._kf.ltrb()
+
+    def to_tlbr(self) -> np.ndarray:
+        return self.to_ltrb()
+
+    def is_tentative(self) -> bool:
+        return self.state == _TENTATIVE
+
+    def is_confirmed(self) -> bool:
+        return self.state == _CONFIRMED
+
+    def is_deleted(self) -> bool:
+        return self.state == _DELETED
+
+
+class SortTracker:
+    """IoU + Kalman multi-object tracker with ByteTrack-style two-stage matching.
+
+    Confident detections are matched to all tracks first; leftover
+    low-confidence detections (below ``high_confidence``) may then still
+    extend confirmed tracks, which keeps a plate's track alive through a
+    blurry frame instead of starting a new one.
+    """
+
+    embedder = None
+
+    def __init__(
+        self,
+        max_age: int = 30,
+        n_init: int = 3,
+        iou_threshold: float = 0.3,
+        high_confidence: float = 0.5,
+        low_iou_threshold: float = 0.5,
+    ):
+        self.max_age = max_age
+        self.n_init = n_init
+        self.iou_threshold = iou_threshold
+        self.high_confidence = high_confidence
+        self.low_iou_threshold = low_iou_threshold
+        self.tracks: List[SortTrack] = []
+        self.del_tracks_ids: List[str] = []
+        self._next_id = 1
+
+    @property
+    def tracker(self) -> "SortTracker":
+        # DeepSort exposes its core tracker as ``.tracker``; both are this object here
+        return self
+
+    def predict(self):
+        for track in self.tracks:
+            track.predict()
+
+    def update_tracks(self, raw_detections: Sequence, frame: Optional[np.ndarray] = None, **_) -> List[SortTrack]:
+        """Advance every track one frame and associate ``raw_detections``.
+
+        Detections are ``([left, top, w, h], confidence, class)`` as for
+        DeepSort; ``frame`` is accepted for compatibility and ignored.
+        """
+        self.predict()
+        boxes = np.array(
+            [[d[0][0], d[0][1], d[0][0] + d[0][2], d[0][1] + d[0][3]] for d in raw_detections], dtype=float
+        ).reshape(-1, 4)
+        confs = np.array([d[1] for d in raw_detections], dtype=float)
+        high = np.flatnonzero(confs >= self.high_confidence)
+        low = np.flatnonzero(confs < self.high_confidence)
+
+        unmatched_tracks = list(range(len(self.tracks)))
+        matches, unmatched_tracks, unmatched_high = self._associate(boxes, high, unmatched_tracks, self.iou_threshold)
+        confirmed_left = [t for t in unmatched_tracks if self.tracks[t].is_confirmed()]
+        low_matches, _, _ = self._associate(boxes, low, confirmed_left, self.low_iou_threshold)
+        matches += low_matches
+
+        matched_tracks = set()
+        for t, d in matches:
+            self.tracks[t].update(boxes[d], confs[d])
+            matched_tracks.add(t)
+        for t, track in enumerate(self.tracks):
+            if t not in matched_tracks:
+                track.mark_missed()
+        for d in unmatched_high:
+            det_class = raw_detections[d][2] if len(raw_detections[d]) > 2 else None
+            self.tracks.append(SortTrack(str(self._next_id), boxes[d], confs[d], det_class, self.n_init, self.max_age))
+            self._next_id += 1
+
+        self.del_tracks_ids = [t.track_id for t in self.tracks if t.is_deleted()]
+        self.tracks = [t for t in self.tracks if not t.is_deleted()]
+        return self.tracks
+
+    def _associate(
+        self, boxes: np.ndarray, det_indices: np.ndarray, track_indices: List[int], min_iou: float
+    ) -> Tuple[List[Tuple[int, int]], List[int], List[int]]:
+        """Greedy highest-IoU-first matching; returns (matches, unmatched tracks, unmatched detections)."""
+        if len(det_indices) == 0 or not track_indices:
+            return [], list(track_indices), list(det_indices)
+        predicted = np.array([self.tracks[t].to_ltrb() for t in track_indices])
+        iou = iou_matrix(predicted, boxes[det_indices])
+        matches = []
+        used_t, used_d = set(), set()
+        for flat in np.argsort(-iou, axis=None):
+            ti, di = divmod(int(flat), iou.shape[1])
+            if iou[ti, di] < min_iou:
+                break
+            if ti in used_t or di in used_d:
+                continue
+            used_t.add(ti)
+            used_d.add(di)
+            matches.append((track_indices[ti], int(det_indices[di])))
+        unmatched_tracks = [t for i, t in enumerate(track_indices) if i not in used_t]
+        unmatched_dets = [int(d) for i, d in enumerate(det_indices) if i not in used_d]
+        return matches, unmatched_tracks, unmatched_dets
+
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU between two sets of (x1, y1, x2, y2) boxes."""
+    tl = np.maximum(a[:, None, :2], b[None, :, :2])
+    br = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.prod(np.clip(br - tl, 0, None), axis=2)
+    area_a = np.prod(a[:, 2:] - a[:, :2], axis=1)
+    area_b = np.prod(b[:, 2:] - b[:, :2], axis=1)
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-9)